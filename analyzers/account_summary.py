@@ -1,57 +1,228 @@
 import pandas as pd
+from typing import List, Union
+
+from datasets import (
+    as_flags, categorize, enable_copy_on_write, load_prepared, load_rollup_store, load_streaming, save_rollup_store
+)
+from sketches import QuantileSketch, percentile_table
+from utils import partial_aggregate
 
 class Generator:
-    def __init__(self, csv_path: str = None, df: pd.DataFrame = None, report_title = "Report Analysis"):
-        """Initialize with either a CSV path or a DataFrame."""
+    # Columns this analyzer reads from the export, and how to type them
+    SCHEMA = {
+        'usecols': [
+            'Ledger Entry ID', 'Event Type', 'Amount', 'Currency', 'Is Credit',
+            'Reference Object ID', 'Created At', 'Payout ID'
+        ],
+        'dtypes': {'Amount': 'float64', 'Is Credit': 'bool', 'Event Type': 'category', 'Currency': 'category'},
+        'dates': ['Created At'],
+        'null': 'NULL',
+        'key': 'Ledger Entry ID'
+    }
+
+    # Partial aggregates that can be merged across chunks: name -> (builder, how to merge each column)
+    _PARTIALS = {
+        'by_event_type': ('_event_type_partial', {'total_amount': 'sum', 'transaction_count': 'sum'}),
+        'by_currency': ('_currency_partial', {'amount_sum': 'sum'}),
+        'by_day': ('_day_partial', {
+            'credits': 'sum', 'debits': 'sum', 'net': 'sum', 'amount': 'sum', 'transaction_count': 'sum',
+            'amount_min': 'min', 'amount_max': 'max'
+        }),
+        # Quantile sketch buckets of entry amounts (see sketches.QuantileSketch), with moments for the mean and spread
+        'by_size': ('_size_partial', {
+            'count': 'sum', 'min': 'min', 'max': 'max', 'amount_sum': 'sum', 'amount_sq': 'sum'
+        }),
+    }
+
+    # Analyses that also work in streaming mode (chunksize=...)
+    STREAMING_ANALYSES = (
+        'total_credits_debits', 'event_type_summary', 'currency_breakdown', 'monthly_trend_analysis',
+        'net_revenue_over_time', 'daily_statistics', 'daily_closing_balance', 'period_summary',
+        'transaction_size_analysis', 'transaction_size_percentiles'
+    )
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", sidecar: str = None, chunksize: int = None,
+                 copy: bool = True, rollup_store: str = None):
+        """
+        Initialize with either a CSV path (a path, glob pattern or list of exports) or a DataFrame.
+
+        sidecar: 'feather' or 'parquet' to keep the prepared data and the partial aggregates
+        (_PARTIALS) next to the CSV and reuse them on later runs until the CSV changes.
+        chunksize: stream the CSV in chunks of this many rows instead of loading it whole. Only
+        STREAMING_ANALYSES are available in this mode and self.df is None.
+        copy: with copy=False the Generator wraps df without copying it. Copy-on-write is turned
+        on, so the caller's frame is left unchanged when columns are re-typed or added.
+        rollup_store: path of a .feather/.parquet file keeping the per-day, per-currency rollups
+        across runs. Days before its last day are taken from the store instead of being
+        aggregated again, so exports may also drop old rows without losing their history.
+        """
+        self.rollup_store = rollup_store
+        self._stored_rollups = load_rollup_store(rollup_store) if rollup_store else None
+        self._rollup_watermark = None
+        if self._stored_rollups is not None and not self._stored_rollups.empty:
+            self._rollup_watermark = self._stored_rollups.index.get_level_values('Date').max()
+            # Partials cached in sidecars only cover days from the watermark on
+            self._sidecar_salt = str(self._rollup_watermark)
+
         if df is not None:
-            self.df = df.copy()
+            if not copy:
+                enable_copy_on_write()
+            self.df = df.copy(deep=copy)
+            # Clean and prepare data
+            self._prepare_data()
+        elif csv_path and chunksize:
+            load_streaming(self, csv_path, chunksize, sidecar=sidecar)
         elif csv_path:
-            self.df = pd.read_csv(csv_path)
+            load_prepared(self, csv_path, sidecar=sidecar)
         else:
             raise ValueError("Either csv_path or df must be provided")
 
+        if rollup_store:
+            self._update_rollup_store()
+
         self.report_title = report_title
 
-        # Clean and prepare data
-        self._prepare_data()
+    def _update_rollup_store(self):
+        """
+        Combines the stored rollups before the watermark with the rollups just aggregated from the
+        watermark day on, and saves the result. The watermark day itself is aggregated again,
+        since it may not have been complete when it was stored.
+        """
+        fresh = partial_aggregate(self, 'by_day')
+        if self._rollup_watermark is not None:
+            stored = self._stored_rollups
+            closed = stored[stored.index.get_level_values('Date') < self._rollup_watermark]
+            fresh = pd.concat([closed, fresh[fresh.index.get_level_values('Date') >= self._rollup_watermark]])
+
+        rollups = fresh[fresh.index.get_level_values('Date').notna()].sort_index()
+        save_rollup_store(rollups, self.rollup_store)
+        self._partials['by_day'] = rollups
 
     def _prepare_data(self):
         """Clean and prepare the dataset for analysis."""
+        # Store low-cardinality text columns as categoricals
+        categorize(self.df, self.SCHEMA)
+
         # Ensure Amount is numeric
         self.df['Amount'] = pd.to_numeric(self.df['Amount'], errors='coerce').fillna(0)
 
+        # Credits add to the balance and debits take away from it; entries without a flag count as debits
+        self.df['Is Credit'] = as_flags(self.df['Is Credit'])
+        self.df['Signed Amount'] = self.df['Amount'].where(self.df['Is Credit'], -self.df['Amount'])
+
         # Parse datetime
         if 'Created At' in self.df.columns:
             self.df['Created At'] = pd.to_datetime(self.df['Created At'], errors='coerce')
+            self.df['Date'] = self.df['Created At'].dt.normalize()
+
+        # Reference object type from the ID prefix (pay_, ref_, payout_, ...)
+        if 'Reference Object ID' in self.df.columns:
+            parts = self.df['Reference Object ID'].str.partition('_')
+            self.df['Reference Type'] = (parts[0] + parts[1]).where(parts[1] == '_').astype('category')
+
+    def _event_type_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.groupby('Event Type', observed=True).agg(
+            total_amount=('Amount', 'sum'),
+            transaction_count=('Event Type', 'count')
+        )
+
+    def _currency_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.groupby(['Currency', 'Is Credit'], observed=True)['Amount'].sum().to_frame('amount_sum')
+
+    def _day_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        if 'Created At' not in df.columns:
+            index = pd.MultiIndex.from_arrays([[], []], names=['Currency', 'Date'])
+            return pd.DataFrame(columns=list(self._PARTIALS['by_day'][1]), index=index)
+
+        # Days before the rollup store's watermark are already final
+        if self._rollup_watermark is not None:
+            df = df[df['Date'] >= self._rollup_watermark]
+
+        is_credit = df['Is Credit'].astype(bool)
+        values = pd.DataFrame({
+            'credits': df['Amount'].where(is_credit, 0),
+            'debits': df['Amount'].where(~is_credit, 0),
+            'net': df['Signed Amount'],
+            'amount': df['Amount'],
+            'transaction_count': 1
+        }, index=df.index)
+        grouped = values.groupby([df['Currency'], df['Date']], observed=True, dropna=False)
+        return pd.concat([
+            grouped.sum(),
+            grouped['amount'].min().rename('amount_min'),
+            grouped['amount'].max().rename('amount_max')
+        ], axis=1)
+
+    def _size_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        amount = df['Amount']
+        values = pd.DataFrame({'amount': amount, 'amount_sum': amount, 'amount_sq': amount ** 2}, index=df.index)
+        grouped = values.groupby([df['Is Credit'].astype(bool), QuantileSketch().bucket_keys(amount)])
+        result = pd.concat([
+            grouped['amount'].agg(['count', 'min', 'max']),
+            grouped[['amount_sum', 'amount_sq']].sum()
+        ], axis=1)
+        return result.rename_axis(['Is Credit', 'Bucket'])
+
+    def _size_sketches(self) -> dict:
+        """A quantile sketch of entry amounts for debits and credits (False, True), where there are any."""
+        buckets = partial_aggregate(self, 'by_size')
+        return {
+            is_credit: QuantileSketch.from_buckets(group.droplevel('Is Credit'))
+            for is_credit, group in buckets.groupby(level='Is Credit')
+        }
+
+    def _daily_ledger(self) -> pd.DataFrame:
+        """
+        Credits, debits and net movement per currency and day, sorted by day, with each day's
+        closing balance (the running sum of net movements, starting from zero).
+        """
+        ledger = partial_aggregate(self, 'by_day')
+        if ledger.empty:
+            return ledger.assign(closing_balance=pd.Series(dtype='float64'))
+
+        ledger = ledger[ledger.index.get_level_values('Date').notna()].sort_index()
+        return ledger.assign(closing_balance=ledger['net'].groupby(level='Currency', dropna=False).cumsum())
+
+    def _daily_totals(self, column: str) -> pd.Series:
+        """One ledger column summed over currencies for every calendar day, including days without entries."""
+        ledger = self._daily_ledger()
+        daily = ledger[column].groupby(level='Date').sum()
+        if daily.empty:
+            return daily
+        return daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D', name='Date'), fill_value=0)
+
+    def _period_rollups(self, freq: str, by_currency: bool = False) -> pd.DataFrame:
+        """The daily rollups combined into periods of `freq` (any resample frequency), optionally per currency."""
+        ledger = self._daily_ledger().drop(columns='closing_balance')
+        keys = [pd.Grouper(level='Date', freq=freq)]
+        if by_currency:
+            keys.insert(0, ledger.index.get_level_values('Currency'))
+        return ledger.groupby(keys, observed=True, dropna=False).agg(self._PARTIALS['by_day'][1])
 
     def total_credits_debits(self) -> pd.DataFrame:
         """Shows total credited and debited amounts across all transactions."""
-        result = self.df.groupby('Is Credit')['Amount'].sum().reset_index()
+        partial = partial_aggregate(self, 'by_currency')
+        result = partial.groupby(level='Is Credit')['amount_sum'].sum().rename('Amount').reset_index()
         result['Is Credit'] = result['Is Credit'].map({True: 'Credits', False: 'Debits'})
         result.rename(columns={'Is Credit': 'Type', 'Amount': 'Total Amount'}, inplace=True)
         return result
 
     def net_revenue_over_time(self, freq: str = 'ME') -> pd.DataFrame:
         """Tracks net revenue trend over time (Credits - Debits). Default = month end."""
-        if self.df.empty or 'Created At' not in self.df.columns:
+        daily = self._daily_totals('net')
+        if daily.empty:
             return pd.DataFrame(columns=['Period', 'Net Revenue'])
 
-        data_copy = self.df.copy()
-        data_copy['SignedAmount'] = data_copy.apply(
-            lambda x: x['Amount'] if x['Is Credit'] else -x['Amount'], axis=1
-        )
-
-        result = data_copy.resample(freq, on='Created At')['SignedAmount'].sum().reset_index()
-        result.rename(columns={'Created At': 'Period', 'SignedAmount': 'Net Revenue'}, inplace=True)
+        result = daily.resample(freq).sum().rename('Net Revenue').rename_axis('Period').reset_index()
         result['Period'] = result['Period'].dt.strftime('%Y-%m')
         return result
 
     def event_type_summary(self) -> pd.DataFrame:
         """Summarizes total amount and count by event type."""
-        result = self.df.groupby('Event Type').agg(
-            total_amount=('Amount', 'sum'),
-            transaction_count=('Event Type', 'count')
-        ).sort_values(by='total_amount', ascending=False).reset_index()
+        result = partial_aggregate(self, 'by_event_type').sort_values(
+            by='total_amount', ascending=False
+        ).reset_index()
 
         result.rename(columns={
             'Event Type': 'Event Type',
@@ -62,9 +233,9 @@ class Generator:
 
     def top_transactions(self, n: int = 10) -> pd.DataFrame:
         """Shows top-N largest transactions by absolute amount."""
-        result = self.df.reindex(
-            self.df['Amount'].abs().sort_values(ascending=False).index
-        ).head(n)[['Ledger Entry ID', 'Event Type', 'Amount', 'Currency', 'Is Credit', 'Created At']]
+        # Only the top-N rows are materialized, not a reordered copy of the whole ledger
+        top_index = self.df['Amount'].abs().sort_values(ascending=False).index[:n]
+        result = self.df.loc[top_index, ['Ledger Entry ID', 'Event Type', 'Amount', 'Currency', 'Is Credit', 'Created At']]
 
         result = result.reset_index(drop=True)
         result['Is Credit'] = result['Is Credit'].map({True: 'Credit', False: 'Debit'})
@@ -72,10 +243,10 @@ class Generator:
 
     def daily_statistics(self) -> pd.DataFrame:
         """Provides daily average transaction volume, volatility, and peak performance metrics."""
-        if self.df.empty or 'Created At' not in self.df.columns:
+        if 'Date' not in partial_aggregate(self, 'by_day').index.names:
             return pd.DataFrame(columns=['Metric', 'Value'])
 
-        daily = self.df.resample('D', on='Created At')['Amount'].sum()
+        daily = self._daily_totals('amount')
 
         stats = {
             'Average Daily Amount': daily.mean(),
@@ -104,23 +275,32 @@ class Generator:
 
     def currency_breakdown(self) -> pd.DataFrame:
         """Shows distribution of transactions across currencies separating credits and debits."""
-        result = self.df.groupby(['Currency', 'Is Credit'])['Amount'].sum().unstack(fill_value=0).reset_index()
-
-        # Rename columns
-        if True in result.columns:
-            result.rename(columns={True: 'Credits'}, inplace=True)
-        if False in result.columns:
-            result.rename(columns={False: 'Debits'}, inplace=True)
-
-        # Fill missing columns
-        if 'Credits' not in result.columns:
-            result['Credits'] = 0
-        if 'Debits' not in result.columns:
-            result['Debits'] = 0
+        # From the Currency x Is Credit totals, so entries without a valid date still count
+        totals = partial_aggregate(self, 'by_currency')['amount_sum'].unstack(fill_value=0)
+        totals = totals.reindex(columns=[False, True], fill_value=0)
 
+        result = totals.rename(columns={False: 'Debits', True: 'Credits'}).rename_axis(columns=None).reset_index()
         result['Net Amount'] = result['Credits'] - result['Debits']
         return result
 
+    def daily_closing_balance(self, days: int = 30) -> pd.DataFrame:
+        """Shows credits, debits and the closing balance per currency for each of the most recent days."""
+        ledger = self._daily_ledger()
+        if ledger.empty:
+            return pd.DataFrame(columns=['Date', 'Currency', 'Credits', 'Debits', 'Net', 'Closing Balance'])
+
+        dates = ledger.index.get_level_values('Date')
+        recent = ledger[dates > dates.max() - pd.Timedelta(days=days)].reset_index().sort_values(['Date', 'Currency'])
+
+        result = recent[['Date', 'Currency', 'credits', 'debits', 'net', 'closing_balance']].rename(columns={
+            'credits': 'Credits',
+            'debits': 'Debits',
+            'net': 'Net',
+            'closing_balance': 'Closing Balance'
+        })
+        result['Date'] = result['Date'].dt.strftime('%Y-%m-%d')
+        return result.round(2)
+
     def refund_analysis(self) -> pd.DataFrame:
         """Calculates comprehensive refund metrics including ratio, volume, and impact assessment."""
         refund_mask = self.df['Event Type'].str.contains('refund', case=False, na=False)
@@ -145,12 +325,12 @@ class Generator:
 
     def tax_impact_analysis(self) -> pd.DataFrame:
         """Aggregates tax and tax_reversal events to evaluate comprehensive tax burden and reversals."""
-        tax_data = self.df[self.df['Event Type'].str.contains('tax', case=False, na=False)]
+        tax_data = self.df.loc[self.df['Event Type'].str.contains('tax', case=False, na=False), ['Event Type', 'Amount']]
 
         if tax_data.empty:
             return pd.DataFrame(columns=['Tax Event Type', 'Total Amount', 'Transaction Count', 'Average Amount'])
 
-        result = tax_data.groupby('Event Type').agg(
+        result = tax_data.groupby('Event Type', observed=True).agg(
             total_amount=('Amount', 'sum'),
             transaction_count=('Event Type', 'count'),
             avg_amount=('Amount', 'mean')
@@ -166,8 +346,26 @@ class Generator:
         return result
 
     def transaction_size_analysis(self) -> pd.DataFrame:
-        """Analyzes average transaction sizes segmented by credit/debit type with distribution metrics."""
-        result = self.df.groupby('Is Credit')['Amount'].agg(['mean', 'median', 'std', 'min', 'max', 'count']).reset_index()
+        """
+        Analyzes average transaction sizes segmented by credit/debit type with distribution metrics.
+        The median comes from a quantile sketch and is within 1% of the exact one.
+        """
+        partial = partial_aggregate(self, 'by_size')
+        totals = partial.groupby(level='Is Credit').agg(self._PARTIALS['by_size'][1])
+
+        # Sample standard deviation from the summed moments, as Series.std
+        mean = totals['amount_sum'] / totals['count']
+        variance = (totals['amount_sq'] - totals['amount_sum'] * mean) / (totals['count'] - 1)
+        sketches = self._size_sketches()
+
+        result = pd.DataFrame({
+            'mean': mean,
+            'median': [sketches[is_credit].quantiles([0.5])[0] for is_credit in totals.index],
+            'std': variance.clip(lower=0) ** 0.5,
+            'min': totals['min'],
+            'max': totals['max'],
+            'count': totals['count']
+        }, index=totals.index).reset_index()
         result['Is Credit'] = result['Is Credit'].map({True: 'Credits', False: 'Debits'})
 
         result.rename(columns={
@@ -182,27 +380,49 @@ class Generator:
 
         return result
 
+    def transaction_size_percentiles(self) -> pd.DataFrame:
+        """P50, P90 and P99 entry amounts for debits and credits, from mergeable quantile sketches (within 1%)."""
+        labels = {False: 'Debits', True: 'Credits'}
+        return percentile_table({labels[is_credit]: sketch for is_credit, sketch in self._size_sketches().items()})
+
     def monthly_trend_analysis(self) -> pd.DataFrame:
         """Analyzes month-over-month trends in transaction volume, value, and growth patterns."""
-        if self.df.empty or 'Created At' not in self.df.columns:
+        if self._daily_ledger().empty:
             return pd.DataFrame(columns=['Month', 'Transaction Count', 'Total Amount', 'Average Amount'])
 
-        monthly = self.df.resample('ME', on='Created At').agg(
-            transaction_count=('Amount', 'count'),
-            total_amount=('Amount', 'sum'),
-            avg_amount=('Amount', 'mean')
-        ).reset_index()
+        # Months without transactions still get a row, as with resample
+        monthly = self._period_rollups('MS')[['transaction_count', 'amount']]
+        monthly['avg_amount'] = monthly['amount'] / monthly['transaction_count']
+        monthly = monthly.rename_axis('Month').reset_index()
 
-        monthly['Created At'] = monthly['Created At'].dt.strftime('%Y-%m')
+        monthly['Month'] = monthly['Month'].dt.strftime('%Y-%m')
         monthly.rename(columns={
-            'Created At': 'Month',
             'transaction_count': 'Transaction Count',
-            'total_amount': 'Total Amount',
+            'amount': 'Total Amount',
             'avg_amount': 'Average Amount'
         }, inplace=True)
 
         return monthly
 
+    def period_summary(self, freq: str = 'W') -> pd.DataFrame:
+        """Summarizes entries per currency and week (ending on the date shown): count, total and net amount, smallest and largest entry."""
+        columns = ['Period', 'Currency', 'Transaction Count', 'Total Amount', 'Net Amount', 'Min Amount', 'Max Amount']
+        if self._daily_ledger().empty:
+            return pd.DataFrame(columns=columns)
+
+        periods = self._period_rollups(freq, by_currency=True)
+        periods = periods[periods['transaction_count'] > 0].reset_index()
+        periods['Period'] = periods['Date'].dt.strftime('%Y-%m-%d')
+        periods.rename(columns={
+            'transaction_count': 'Transaction Count',
+            'amount': 'Total Amount',
+            'net': 'Net Amount',
+            'amount_min': 'Min Amount',
+            'amount_max': 'Max Amount'
+        }, inplace=True)
+
+        return periods[columns].round(2)
+
     def fee_structure_analysis(self) -> pd.DataFrame:
         """Analyzes payment processing fees, patterns, and cost structure across different fee types."""
         fee_mask = self.df['Event Type'].str.contains('fee', case=False, na=False)
@@ -210,8 +430,8 @@ class Generator:
         if not fee_mask.any():
             return pd.DataFrame(columns=['Fee Type', 'Total Fees', 'Transaction Count', 'Average Fee'])
 
-        fee_data = self.df[fee_mask]
-        result = fee_data.groupby('Event Type').agg(
+        fee_data = self.df.loc[fee_mask, ['Event Type', 'Amount']]
+        result = fee_data.groupby('Event Type', observed=True).agg(
             total_fees=('Amount', 'sum'),
             transaction_count=('Event Type', 'count'),
             avg_fee=('Amount', 'mean')
@@ -231,18 +451,14 @@ class Generator:
         if 'Reference Object ID' not in self.df.columns:
             return pd.DataFrame(columns=['Reference Type', 'Unique Objects', 'Total Transactions', 'Total Amount'])
 
-        # Extract reference type from ID prefix
-        self.df['Reference Type'] = self.df['Reference Object ID'].str.extract(r'^([a-zA-Z_]+)')[0]
-
-        result = self.df.groupby('Reference Type').agg(
+        result = self.df.groupby('Reference Type', observed=True).agg(
             unique_objects=('Reference Object ID', 'nunique'),
             total_transactions=('Reference Object ID', 'count'),
-            total_amount=('Amount', 'sum'),
-            avg_amount_per_object=('Amount', lambda x: x.sum() / x.nunique() if x.nunique() > 0 else 0)
+            total_amount=('Amount', 'sum')
         ).reset_index()
+        result['avg_amount_per_object'] = (result['total_amount'] / result['unique_objects']).where(result['unique_objects'] > 0, 0)
 
         result.rename(columns={
-            'Reference Type': 'Reference Type',
             'unique_objects': 'Unique Objects',
             'total_transactions': 'Total Transactions',
             'total_amount': 'Total Amount',
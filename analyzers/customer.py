@@ -1,22 +1,106 @@
+import numpy as np
 import pandas as pd
+from typing import Dict, Iterator, List, Tuple, Union
+
+from datasets import categorize, enable_copy_on_write, load_prepared
 
 class Generator:
-    def __init__(self, csv_path: str = None, df: pd.DataFrame = None, report_title = "Report Analysis"):
-        """Initialize with either a CSV path or a DataFrame."""
+    # Columns this analyzer reads from the export, and how to type them
+    SCHEMA = {
+        'usecols': [
+            'Customer ID', 'Customer Name', 'Customer Email', 'Success Orders Count', 'Success Orders Amount',
+            'Settlement Currency', 'Total Refunds Count', 'Total Refunds Amount',
+            'Total Disputes Count', 'Total Disputes Amount'
+        ],
+        'dtypes': {
+            'Success Orders Count': 'int64', 'Success Orders Amount': 'float64',
+            'Total Refunds Count': 'int64', 'Total Refunds Amount': 'float64',
+            'Total Disputes Count': 'int64', 'Total Disputes Amount': 'float64',
+            'Settlement Currency': 'category'
+        },
+        'dates': [],
+        'null': 'NULL',
+        'key': 'Customer ID'
+    }
+
+    # Customer segments: name -> right-closed bin edges and one label per bin, in report order.
+    # Overridden per segment by the `segments` option (see config.yaml).
+    SEGMENTS = {
+        'revenue': {
+            'bins': [0, 0.01, 5000, 15000, 30000, float('inf')],
+            'labels': ['No Revenue', 'Low (≤₹5K)', 'Medium (₹5K-15K)', 'High (₹15K-30K)', 'Premium (>₹30K)']
+        },
+        'aov': {
+            'bins': [0, 500, 1000, 2000, float('inf')],
+            'labels': ['Low AOV (≤₹500)', 'Medium AOV (₹500-1K)', 'High AOV (₹1K-2K)', 'Premium AOV (>₹2K)']
+        },
+        'loyalty': {
+            'bins': [float('-inf'), 0, 1, 5, 10, float('inf')],
+            'labels': ['Inactive', 'One-time', 'Occasional (2-5)', 'Regular (6-10)', 'Loyal (>10)']
+        },
+        'risk': {
+            'bins': [float('-inf'), 0, 5, 15, float('inf')],
+            'labels': ['No Risk', 'Low Risk (≤5%)', 'Medium Risk (5-15%)', 'High Risk (>15%)']
+        },
+    }
+
+    # Mail providers that ignore dots in the local part of an address
+    DOTLESS_DOMAINS = {'gmail.com': 'gmail.com', 'googlemail.com': 'gmail.com'}
+
+    # Key values that stand for a missing name or email (text columns are read with astype(str))
+    MISSING_KEYS = ['', 'nan', 'none', 'null']
+
+    # Duplicate customers are scored pairwise: a pair scores the weights of the keys it agrees on,
+    # and pairs scoring MATCH_THRESHOLD or more are the same person. That is the same mailbox, or
+    # the same name and mailbox name on another domain; a name alone is shared by too many people.
+    MATCH_WEIGHTS = {'Email Key': 1.0, 'Name Key': 0.5, 'Mailbox Name': 0.5}
+    MATCH_THRESHOLD = 1.0
+
+    # Candidate pairs (sorted neighbourhood): every matching pair shares the mailbox name, so only
+    # customers in the same BLOCK_KEY block are compared, each with its MATCH_WINDOW nearest
+    # neighbours after sorting the blocks by each of SORT_KEYS. Customers with equal sort keys are
+    # adjacent, so their matches chain through neighbours and comparisons grow linearly.
+    BLOCK_KEY = 'Mailbox Name'
+    SORT_KEYS = ['Email Key', 'Name Key']
+    MATCH_WINDOW = 3
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", sidecar: str = None,
+                 copy: bool = True, segments: Dict[str, Dict[str, list]] = None):
+        """
+        Initialize with either a CSV path (a path, glob pattern or list of exports) or a DataFrame.
+
+        sidecar: 'feather' or 'parquet' to keep the prepared data next to the CSV and reuse it
+        on later runs until the CSV changes.
+        copy: with copy=False the Generator wraps df without copying it. Copy-on-write is turned
+        on, so the caller's frame is left unchanged when columns are re-typed or added.
+        segments: {'revenue' | 'aov' | 'loyalty' | 'risk': {'bins': [...], 'labels': [...]}} to
+        replace the default bins and labels of those segments.
+        """
+        self.segments = {**self.SEGMENTS, **(segments or {})}
+        for name, segment in self.segments.items():
+            if len(segment['labels']) != len(segment['bins']) - 1:
+                raise ValueError(f"Segment '{name}' needs one label per bin: "
+                                 f"{len(segment['bins'])} edges but {len(segment['labels'])} labels")
+
         if df is not None:
-            self.df = df.copy()
+            if not copy:
+                enable_copy_on_write()
+            self.df = df.copy(deep=copy)
+            # Clean and prepare data
+            self._prepare_data()
         elif csv_path:
-            self.df = pd.read_csv(csv_path)
+            load_prepared(self, csv_path, sidecar=sidecar)
         else:
             raise ValueError("Either csv_path or df must be provided")
 
         self.report_title = report_title
 
-        # Clean and prepare data
-        self._prepare_data()
-
     def _prepare_data(self):
         """Clean and prepare the customer dataset for analysis."""
+        # Store low-cardinality text columns as categoricals
+        categorize(self.df, self.SCHEMA)
+
         # Ensure numeric columns are properly typed
         numeric_columns = [
             'Success Orders Count', 'Success Orders Amount',
@@ -35,20 +119,42 @@ class Generator:
         if 'Customer Email' in self.df.columns:
             self.df['Customer Email'] = self.df['Customer Email'].astype(str).str.strip().str.lower()
 
+        # Keys for duplicate detection, normalized once here rather than per comparison
+        if 'Customer Name' in self.df.columns:
+            self.df['Name Key'] = self.df['Customer Name'].str.replace(r'\s+', ' ', regex=True).str.lower()
+        if 'Customer Email' in self.df.columns:
+            self.df['Email Key'] = self._email_key(self.df['Customer Email'])
+            self.df['Mailbox Name'] = self.df['Email Key'].str.partition('@')[0]
+
         # Calculate derived metrics
         self.df['Net Revenue'] = self.df['Success Orders Amount'] - self.df['Total Refunds Amount']
-        self.df['Average Order Value'] = self.df.apply(
-            lambda x: x['Success Orders Amount'] / x['Success Orders Count'] if x['Success Orders Count'] > 0 else 0,
-            axis=1
-        )
-        self.df['Refund Rate'] = self.df.apply(
-            lambda x: (x['Total Refunds Amount'] / x['Success Orders Amount'] * 100) if x['Success Orders Amount'] > 0 else 0,
-            axis=1
-        )
-        self.df['Dispute Rate'] = self.df.apply(
-            lambda x: (x['Total Disputes Amount'] / x['Success Orders Amount'] * 100) if x['Success Orders Amount'] > 0 else 0,
-            axis=1
-        )
+        self.df['Average Order Value'] = self._safe_divide(self.df['Success Orders Amount'], self.df['Success Orders Count'])
+        self.df['Refund Rate'] = self._safe_divide(self.df['Total Refunds Amount'], self.df['Success Orders Amount']) * 100
+        self.df['Dispute Rate'] = self._safe_divide(self.df['Total Disputes Amount'], self.df['Success Orders Amount']) * 100
+
+    def _email_key(self, emails: pd.Series) -> pd.Series:
+        """
+        The mailbox an address delivers to: '+tag' suffixes dropped and, for providers that ignore
+        them, dots removed from the local part (j.doe+shop@googlemail.com -> jdoe@gmail.com).
+        """
+        parts = emails.str.rpartition('@')
+        local = parts[0].str.partition('+')[0]
+        domain = parts[2].map(self.DOTLESS_DOMAINS)
+        dotless = domain.notna()
+        local = local.where(~dotless, local.str.replace('.', '', regex=False))
+        key = local + '@' + domain.fillna(parts[2])
+        # Values without an '@' are kept as they are
+        return key.where(parts[1] == '@', emails)
+
+    @staticmethod
+    def _safe_divide(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+        """numerator / denominator, with 0 wherever the denominator is not positive."""
+        return (numerator / denominator.where(denominator > 0)).fillna(0)
+
+    def _segment(self, name: str, values: pd.Series, column: str) -> pd.Series:
+        """Ordered categorical of the `name` segment each value falls in, named `column`."""
+        segment = self.segments[name]
+        return pd.cut(values, bins=segment['bins'], labels=segment['labels'], include_lowest=True).rename(column)
 
     def customer_revenue_summary(self) -> pd.DataFrame:
         """Shows total revenue, orders, and customer metrics summary."""
@@ -86,47 +192,35 @@ class Generator:
 
     def customers_with_refunds(self) -> pd.DataFrame:
         """Lists all customers who have requested refunds."""
-        refund_customers = self.df[self.df['Total Refunds Count'] > 0].copy()
+        refund_customers = self.df.loc[
+            self.df['Total Refunds Count'] > 0,
+            ['Customer Name', 'Customer Email', 'Total Refunds Count', 'Total Refunds Amount', 'Refund Rate']
+        ]
         if refund_customers.empty:
             return pd.DataFrame(columns=['Customer Name', 'Customer Email', 'Total Refunds Count', 'Total Refunds Amount', 'Refund Rate'])
 
-        result = refund_customers[
-            ['Customer Name', 'Customer Email', 'Total Refunds Count', 'Total Refunds Amount', 'Refund Rate']
-        ].copy()
-        result = result.round(2)
+        result = refund_customers.round(2)
         result.reset_index(drop=True, inplace=True)
         return result
 
     def customers_with_disputes(self) -> pd.DataFrame:
         """Lists all customers who have raised disputes."""
-        dispute_customers = self.df[self.df['Total Disputes Count'] > 0].copy()
+        dispute_customers = self.df.loc[
+            self.df['Total Disputes Count'] > 0,
+            ['Customer Name', 'Customer Email', 'Total Disputes Count', 'Total Disputes Amount', 'Dispute Rate']
+        ]
         if dispute_customers.empty:
             return pd.DataFrame(columns=['Customer Name', 'Customer Email', 'Total Disputes Count', 'Total Disputes Amount', 'Dispute Rate'])
 
-        result = dispute_customers[
-            ['Customer Name', 'Customer Email', 'Total Disputes Count', 'Total Disputes Amount', 'Dispute Rate']
-        ].copy()
-        result = result.round(2)
+        result = dispute_customers.round(2)
         result.reset_index(drop=True, inplace=True)
         return result
 
     def revenue_distribution_analysis(self) -> pd.DataFrame:
         """Analyzes revenue distribution across different customer segments."""
-        # Define revenue segments
-        conditions = [
-            (self.df['Success Orders Amount'] == 0),
-            (self.df['Success Orders Amount'] <= 5000),
-            (self.df['Success Orders Amount'] <= 15000),
-            (self.df['Success Orders Amount'] <= 30000),
-            (self.df['Success Orders Amount'] > 30000)
-        ]
-        labels = ['No Revenue', 'Low (≤₹5K)', 'Medium (₹5K-15K)', 'High (₹15K-30K)', 'Premium (>₹30K)']
+        revenue_segment = self._segment('revenue', self.df['Success Orders Amount'], 'Revenue Segment')
 
-        self.df['Revenue Segment'] = pd.cut(self.df['Success Orders Amount'],
-                                            bins=[0, 0.01, 5000, 15000, 30000, float('inf')],
-                                            labels=labels, include_lowest=True)
-
-        result = self.df.groupby('Revenue Segment', observed=True).agg({
+        result = self.df.groupby(revenue_segment, observed=True).agg({
             'Customer ID': 'count',
             'Success Orders Amount': 'sum',
             'Success Orders Count': 'sum',
@@ -139,25 +233,16 @@ class Generator:
 
     def average_order_value_analysis(self) -> pd.DataFrame:
         """Analyzes average order value patterns across customers."""
-        # Define AOV segments
-        active_customers = self.df[self.df['Success Orders Count'] > 0].copy()
+        active_customers = self.df.loc[
+            self.df['Success Orders Count'] > 0, ['Customer ID', 'Success Orders Amount', 'Average Order Value']
+        ]
 
         if active_customers.empty:
             return pd.DataFrame(columns=['AOV Segment', 'Customer Count', 'Total Revenue', 'Average AOV'])
 
-        conditions = [
-            (active_customers['Average Order Value'] <= 500),
-            (active_customers['Average Order Value'] <= 1000),
-            (active_customers['Average Order Value'] <= 2000),
-            (active_customers['Average Order Value'] > 2000)
-        ]
-        labels = ['Low AOV (≤₹500)', 'Medium AOV (₹500-1K)', 'High AOV (₹1K-2K)', 'Premium AOV (>₹2K)']
-
-        active_customers['AOV Segment'] = pd.cut(active_customers['Average Order Value'],
-                                                 bins=[0, 500, 1000, 2000, float('inf')],
-                                                 labels=labels, include_lowest=True)
+        aov_segment = self._segment('aov', active_customers['Average Order Value'], 'AOV Segment')
 
-        result = active_customers.groupby('AOV Segment', observed=True).agg({
+        result = active_customers.groupby(aov_segment, observed=True).agg({
             'Customer ID': 'count',
             'Success Orders Amount': 'sum',
             'Average Order Value': 'mean'
@@ -169,34 +254,16 @@ class Generator:
 
     def customer_loyalty_analysis(self) -> pd.DataFrame:
         """Segments customers based on order frequency to identify loyalty patterns."""
-        # Create loyalty segments using proper binning
-        def categorize_loyalty(order_count):
-            if order_count == 0:
-                return 'Inactive'
-            elif order_count == 1:
-                return 'One-time'
-            elif 2 <= order_count <= 5:
-                return 'Occasional (2-5)'
-            elif 6 <= order_count <= 10:
-                return 'Regular (6-10)'
-            else:
-                return 'Loyal (>10)'
-
-        # Apply categorization
-        self.df['Loyalty Segment'] = self.df['Success Orders Count'].apply(categorize_loyalty)
-
-        result = self.df.groupby('Loyalty Segment').agg({
+        loyalty_segment = self._segment('loyalty', self.df['Success Orders Count'], 'Loyalty Segment')
+
+        # Segments come out in their configured order
+        result = self.df.groupby(loyalty_segment, observed=True).agg({
             'Customer ID': 'count',
             'Success Orders Amount': 'sum',
             'Success Orders Count': 'sum',
             'Average Order Value': 'mean'
         }).reset_index()
 
-        # Define the desired order for segments
-        segment_order = ['Inactive', 'One-time', 'Occasional (2-5)', 'Regular (6-10)', 'Loyal (>10)']
-        result['Loyalty Segment'] = pd.Categorical(result['Loyalty Segment'], categories=segment_order, ordered=True)
-        result = result.sort_values('Loyalty Segment').reset_index(drop=True)
-
         result.rename(columns={'Customer ID': 'Customer Count'}, inplace=True)
         result = result.round(2)
         return result
@@ -204,40 +271,25 @@ class Generator:
     def risk_assessment_analysis(self) -> pd.DataFrame:
         """Identifies customers with high refund or dispute rates for risk assessment."""
         # Only consider customers with actual transactions
-        active_customers = self.df[self.df['Success Orders Amount'] > 0].copy()
+        active_customers = self.df.loc[
+            self.df['Success Orders Amount'] > 0, ['Customer ID', 'Refund Rate', 'Dispute Rate', 'Success Orders Amount']
+        ]
 
         if active_customers.empty:
             return pd.DataFrame(columns=['Risk Level', 'Customer Count', 'Avg Refund Rate', 'Avg Dispute Rate', 'Total Revenue Impact'])
 
         # Calculate risk score
-        active_customers['Risk Score'] = active_customers['Refund Rate'] + active_customers['Dispute Rate']
-
-        # Define risk levels using function-based approach
-        def categorize_risk(risk_score):
-            if risk_score == 0:
-                return 'No Risk'
-            elif risk_score <= 5:
-                return 'Low Risk (≤5%)'
-            elif risk_score <= 15:
-                return 'Medium Risk (5-15%)'
-            else:
-                return 'High Risk (>15%)'
-
-        # Apply categorization
-        active_customers['Risk Level'] = active_customers['Risk Score'].apply(categorize_risk)
-
-        result = active_customers.groupby('Risk Level').agg({
+        risk_score = active_customers['Refund Rate'] + active_customers['Dispute Rate']
+        risk_level = self._segment('risk', risk_score, 'Risk Level')
+
+        # Risk levels come out in their configured order
+        result = active_customers.groupby(risk_level, observed=True).agg({
             'Customer ID': 'count',
             'Refund Rate': 'mean',
             'Dispute Rate': 'mean',
             'Success Orders Amount': 'sum'
         }).reset_index()
 
-        # Define the desired order for risk levels
-        risk_order = ['No Risk', 'Low Risk (≤5%)', 'Medium Risk (5-15%)', 'High Risk (>15%)']
-        result['Risk Level'] = pd.Categorical(result['Risk Level'], categories=risk_order, ordered=True)
-        result = result.sort_values('Risk Level').reset_index(drop=True)
-
         result.rename(columns={
             'Customer ID': 'Customer Count',
             'Refund Rate': 'Avg Refund Rate',
@@ -247,10 +299,9 @@ class Generator:
         result = result.round(2)
         return result
 
-
     def currency_breakdown_analysis(self) -> pd.DataFrame:
         """Analyzes revenue and customer distribution by settlement currency."""
-        result = self.df.groupby('Settlement Currency').agg({
+        result = self.df.groupby('Settlement Currency', observed=True).agg({
             'Customer ID': 'count',
             'Success Orders Amount': 'sum',
             'Success Orders Count': 'sum',
@@ -267,14 +318,140 @@ class Generator:
         """Identifies potential duplicate customers based on email addresses."""
         email_counts = self.df.groupby('Customer Email').agg({
             'Customer ID': 'count',
-            'Customer Name': lambda x: ', '.join(x.unique()),
             'Success Orders Amount': 'sum',
             'Success Orders Count': 'sum'
-        }).reset_index()
+        })
 
         # Only show emails with multiple customer IDs
-        duplicates = email_counts[email_counts['Customer ID'] > 1].copy()
-        duplicates.rename(columns={'Customer ID': 'Account Count'}, inplace=True)
-        duplicates = duplicates.round(2)
-        duplicates.reset_index(drop=True, inplace=True)
-        return duplicates
+        duplicates = email_counts[email_counts['Customer ID'] > 1]
+        if duplicates.empty:
+            return pd.DataFrame(columns=['Customer Email', 'Account Count', 'Customer Name',
+                                         'Success Orders Amount', 'Success Orders Count'])
+
+        # Names are only collected for the (few) duplicated emails
+        rows = self.df.loc[self.df['Customer Email'].isin(duplicates.index), ['Customer Email', 'Customer Name']]
+        names = rows.drop_duplicates().groupby('Customer Email')['Customer Name'].agg(', '.join)
+
+        result = duplicates.assign(**{'Customer Name': names}).reset_index()
+        result = result[['Customer Email', 'Customer ID', 'Customer Name', 'Success Orders Amount', 'Success Orders Count']]
+        result.rename(columns={'Customer ID': 'Account Count'}, inplace=True)
+        result = result.round(2)
+        return result
+
+    def _key_codes(self) -> Dict[str, np.ndarray]:
+        """Integer code of each customer's MATCH_WEIGHTS keys, -1 where the key is missing."""
+        codes = {}
+        for col in self.MATCH_WEIGHTS:
+            if col not in self.df.columns:
+                codes[col] = np.full(len(self.df), -1)
+                continue
+            values = self.df[col]
+            codes[col] = pd.factorize(values.where(~values.isin(self.MISSING_KEYS)))[0]
+        return codes
+
+    def _candidate_pairs(self, codes: Dict[str, np.ndarray]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Positions of the customer pairs to score, one batch per SORT_KEYS order and neighbour
+        distance, so only one batch of candidates is held at a time.
+        """
+        block = codes[self.BLOCK_KEY]
+        for key in self.SORT_KEYS:
+            order = np.lexsort((codes[key], block))
+            order = order[block[order] >= 0]
+            for offset in range(1, self.MATCH_WINDOW + 1):
+                first, second = order[:-offset], order[offset:]
+                same_block = block[first] == block[second]
+                yield first[same_block], second[same_block]
+
+    @staticmethod
+    def _connected_components(parent: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Component label (its smallest member) of each node once the edges are added to the
+        components in `parent` (np.arange(n) for none, or a result of this method), by union-find:
+        every round hooks the larger root of each edge under the smaller one, then compresses all
+        paths by pointer jumping, so each round is linear and only a few rounds are needed.
+        """
+        while True:
+            source_root, target_root = parent[sources], parent[targets]
+            differ = source_root != target_root
+            if not differ.any():
+                return parent
+
+            low = np.minimum(source_root[differ], target_root[differ])
+            high = np.maximum(source_root[differ], target_root[differ])
+            np.minimum.at(parent, high, low)
+
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+
+    def _duplicate_clusters(self) -> pd.DataFrame:
+        """
+        Customer ID, cluster and how it matched of every customer scoring MATCH_THRESHOLD or more
+        against another one. A cluster is a connected component of the matching pairs, so it also
+        holds customers matched only through a chain of others.
+        """
+        codes = self._key_codes()
+        email = codes['Email Key']
+        email_match = np.zeros(len(self.df), dtype=bool)
+        name_match = np.zeros(len(self.df), dtype=bool)
+        labels = np.arange(len(self.df))
+
+        for left, right in self._candidate_pairs(codes):
+            score = np.zeros(len(left))
+            for col, code in codes.items():
+                score += self.MATCH_WEIGHTS[col] * ((code[left] == code[right]) & (code[left] >= 0))
+
+            matched = score >= self.MATCH_THRESHOLD
+            left, right = left[matched], right[matched]
+
+            # Pairs with the same mailbox match on email, the others on name and mailbox name
+            by_email = (email[left] == email[right]) & (email[left] >= 0)
+            email_match[left[by_email]] = email_match[right[by_email]] = True
+            name_match[left[~by_email]] = name_match[right[~by_email]] = True
+
+            # Each batch is merged into the components right away, so no pair outlives its batch
+            labels = self._connected_components(labels, left, right)
+
+        linked = email_match | name_match
+
+        candidates = self.df.loc[linked, ['Customer ID']].assign(email_match=email_match[linked], name_match=name_match[linked])
+        return candidates.assign(cluster=labels[linked])
+
+    def duplicate_customer_clusters(self, limit: int = 50) -> pd.DataFrame:
+        """Groups customers that look like the same person: same mailbox (Gmail dots and +aliases ignored), or same name apart from case and spacing with the same mailbox name on another domain."""
+        columns = ['Cluster', 'Account Count', 'Matched On', 'Customer Names', 'Customer Emails',
+                   'Success Orders Amount', 'Success Orders Count']
+        members = self._duplicate_clusters()
+        if members.empty:
+            return pd.DataFrame(columns=columns)
+
+        members = members.join(self.df[['Customer Name', 'Customer Email', 'Success Orders Amount', 'Success Orders Count']])
+        clusters = members.groupby('cluster').agg(
+            account_count=('Customer ID', 'count'),
+            email_match=('email_match', 'any'),
+            name_match=('name_match', 'any'),
+            amount=('Success Orders Amount', 'sum'),
+            orders=('Success Orders Count', 'sum')
+        ).sort_values(['account_count', 'amount'], ascending=False).head(limit)
+
+        # Names and emails are only listed for the clusters shown
+        shown = members[members['cluster'].isin(clusters.index)]
+        names = shown.drop_duplicates(['cluster', 'Customer Name']).groupby('cluster')['Customer Name'].agg(', '.join)
+        emails = shown.drop_duplicates(['cluster', 'Customer Email']).groupby('cluster')['Customer Email'].agg(', '.join)
+
+        result = pd.DataFrame({
+            'Cluster': np.arange(1, len(clusters) + 1),
+            'Account Count': clusters['account_count'].to_numpy(),
+            'Matched On': np.select(
+                [clusters['email_match'] & clusters['name_match'], clusters['email_match']],
+                ['Email + Name and Mailbox Name', 'Email'], 'Name and Mailbox Name'
+            ),
+            'Customer Names': names.reindex(clusters.index).to_numpy(),
+            'Customer Emails': emails.reindex(clusters.index).to_numpy(),
+            'Success Orders Amount': clusters['amount'].to_numpy(),
+            'Success Orders Count': clusters['orders'].to_numpy()
+        })
+        return result.round(2)
@@ -1,22 +1,141 @@
+import os
 import pandas as pd
+from typing import Dict, List, Union
+
+from datasets import (
+    categorize, enable_copy_on_write, iter_prepared_frames, load_prepared, load_streaming, resolve_csv_paths,
+    spill_partitioned
+)
+from sketches import heavy_hitters, sketch_capacity
+from utils import partial_aggregate
 
 class Generator:
-    def __init__(self, csv_path: str = None, df: pd.DataFrame = None, report_title = "Report Analysis"):
-        """Initialize with either a CSV path or a DataFrame."""
+    # Columns this analyzer reads from the export, and how to type them
+    SCHEMA = {
+        'usecols': [
+            'Payment ID', 'Created At', 'Customer Email', 'Billing Country', 'Amount', 'Tax', 'Currency',
+            'Settlement Amount', 'Settlement Tax', 'Settlement Currency',
+            'Payment Method', 'Payment Method Type', 'Payment Status', 'Payment Fee',
+            'Net Amount In Wallet After Fees'
+        ],
+        'dtypes': {
+            'Amount': 'float64', 'Tax': 'float64', 'Settlement Amount': 'float64', 'Settlement Tax': 'float64',
+            'Payment Fee': 'float64', 'Net Amount In Wallet After Fees': 'float64',
+            'Payment Status': 'category', 'Payment Method': 'category', 'Payment Method Type': 'category',
+            'Currency': 'category', 'Settlement Currency': 'category', 'Billing Country': 'category'
+        },
+        'dates': ['Created At'],
+        'null': 'NULL',
+        'key': 'Payment ID'
+    }
+
+    # Dimensions of the payments cube: one row per combination that occurs in the data
+    CUBE_KEYS = ['Payment Status', 'Payment Method', 'Payment Method Type', 'Settlement Currency', 'Billing Country', 'Date']
+
+    # Cube measures: column -> prefix. Each gets _sum and _count; the first four also _sumsq,
+    # so variances can be derived as sumsq / count - (sum / count) ** 2.
+    CUBE_MEASURES = {
+        'Amount': 'amount', 'Tax': 'tax', 'Payment Fee': 'fee', 'Settlement Amount': 'settlement_amount',
+        'Settlement Tax': 'settlement_tax', 'Tax Rate': 'tax_rate', 'Amount Difference': 'amount_diff',
+        'Tax Difference': 'tax_diff'
+    }
+    CUBE_SUMSQ = ['Amount', 'Tax', 'Payment Fee', 'Settlement Amount']
+
+    # Partial aggregates that can be merged across chunks: name -> (builder, how to merge each column)
+    _PARTIALS = {
+        'cube': ('_cube_partial', dict.fromkeys([
+            'ids', 'rows',
+            'amount_sum', 'amount_count', 'tax_sum', 'tax_count', 'fee_sum', 'fee_count',
+            'settlement_amount_sum', 'settlement_amount_count', 'settlement_tax_sum', 'settlement_tax_count',
+            'tax_rate_sum', 'tax_rate_count', 'amount_diff_sum', 'amount_diff_count', 'tax_diff_sum', 'tax_diff_count',
+            'amount_sumsq', 'tax_sumsq', 'fee_sumsq', 'settlement_amount_sumsq'
+        ], 'sum')),
+    }
+
+    # Per-customer partial aggregate, merged across chunks or spill partitions like _PARTIALS
+    _CUSTOMER_PARTIAL = {
+        'ids': 'sum', 'amount_sum': 'sum', 'amount_count': 'sum', 'succeeded': 'sum', 'fee_sum': 'sum'
+    }
+
+    CUSTOMER_COLUMNS = [
+        'Customer Email', 'Total Transactions', 'Total Amount', 'Average Transaction', 'Successful Payments',
+        'Total Fees Paid', 'Success Rate (%)'
+    ]
+
+    # Analyses that also work in streaming mode (chunksize=...)
+    STREAMING_ANALYSES = (
+        'payment_status_summary', 'payment_method_analysis', 'daily_transaction_volume', 'fee_analysis',
+        'tax_analysis', 'settlement_analysis'
+    )
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", sidecar: str = None, chunksize: int = None,
+                 copy: bool = True, customer_partitions: int = None, customer_top_k: int = 100,
+                 customer_table: str = None, wallet_index: bool = False, wallet_window: int = 10,
+                 wallet_start: str = None, wallet_end: str = None, approx: Union[List[str], Dict[str, int]] = None):
+        """
+        Initialize with either a CSV path (a path, glob pattern or list of exports) or a DataFrame.
+
+        sidecar: 'feather' or 'parquet' to keep the prepared data and the partial aggregates
+        (_PARTIALS) next to the CSV and reuse them on later runs until the CSV changes.
+        chunksize: stream the CSV in chunks of this many rows instead of loading it whole. Only
+        STREAMING_ANALYSES are available in this mode and self.df is None.
+        copy: with copy=False the Generator wraps df without copying it. Copy-on-write is turned
+        on, so the caller's frame is left unchanged when columns are re-typed or added.
+        customer_partitions: aggregate customer_analysis out of core, spilling per-customer
+        partials to this many hash partitions on disk. Only the customer_top_k customers by total
+        amount go into the report; the full table is written to customer_table (by default a
+        hidden `.<export>.customers.csv` file next to the CSV, which `*` globs over the exports
+        never match). Also available in streaming mode.
+        wallet_index: build the time-sorted wallet balance timeline once up front, so
+        wallet_balance_trend is a slice instead of a sort over every successful payment.
+        wallet_window, wallet_start, wallet_end: defaults for wallet_balance_trend's window size
+        and date range (any string pandas can parse, e.g. '2025-06-01').
+        approx: analyses to run approximately in one pass with fixed memory (a Space-Saving
+        sketch, see sketches.py), as a list or as {analysis: sketch capacity}. Supported:
+        customer_analysis, which then lists the customer_top_k customers with error bounds.
+        Also available in streaming mode.
+        """
         if df is not None:
-            self.df = df.copy()
+            if not copy:
+                enable_copy_on_write()
+            self.df = df.copy(deep=copy)
+            # Clean and prepare data
+            self._prepare_data()
+        elif csv_path and chunksize:
+            load_streaming(self, csv_path, chunksize, sidecar=sidecar)
         elif csv_path:
-            self.df = pd.read_csv(csv_path)
+            load_prepared(self, csv_path, sidecar=sidecar)
         else:
             raise ValueError("Either csv_path or df must be provided")
 
         self.report_title = report_title
-
-        # Clean and prepare data
-        self._prepare_data()
+        self.customer_partitions = customer_partitions
+        self.customer_top_k = customer_top_k
+        self.customer_table = customer_table
+        if customer_table is None and csv_path:
+            # Hidden like the sidecars, so a glob such as payments-*.csv never reads it back as an export
+            directory, name = os.path.split(os.path.splitext(resolve_csv_paths(csv_path)[0])[0])
+            self.customer_table = os.path.join(directory, f".{name}.customers.csv")
+
+        self.approx = approx if isinstance(approx, dict) else dict.fromkeys(approx or ())
+
+        if customer_partitions or 'customer_analysis' in self.approx:
+            # The partitioned and approximate customer_analysis stream the export again, so they work without self.df
+            self.STREAMING_ANALYSES = self.STREAMING_ANALYSES + ('customer_analysis',)
+
+        self.wallet_window = wallet_window
+        self.wallet_start = wallet_start
+        self.wallet_end = wallet_end
+        self._wallet_timeline = None
+        if wallet_index and self.df is not None and 'Net Amount In Wallet After Fees' in self.df.columns:
+            self._wallet_timeline = self._build_wallet_timeline(self._wallet_rows())
 
     def _prepare_data(self):
         """Clean and prepare the dataset for analysis."""
+        # Store low-cardinality text columns as categoricals
+        categorize(self.df, self.SCHEMA)
+
         # Ensure Amount is numeric
         self.df['Amount'] = pd.to_numeric(self.df['Amount'], errors='coerce').fillna(0)
 
@@ -24,95 +143,182 @@ class Generator:
         if 'Created At' in self.df.columns:
             self.df['Created At'] = pd.to_datetime(self.df['Created At'], errors='coerce')
 
+            # Time dimensions, derived once for every time-based analysis. Date stays datetime64
+            # (midnight) rather than Python date objects, which are much slower to group on.
+            created = self.df['Created At']
+            self.df['Date'] = created.dt.normalize()
+            self.df['Hour'] = created.dt.hour
+            self.df['Weekday'] = created.dt.dayofweek
+            self.df['Month'] = created.dt.to_period('M')
+
+        # Outcome flags, so counts and rates are plain sum/mean aggregations
+        self.df['Succeeded'] = self.df['Payment Status'] == 'succeeded'
+        self.df['Failed'] = self.df['Payment Status'] == 'failed'
+
+    def _cube_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregates df into the payments cube in a single groupby pass."""
+        values = df[['Payment ID', 'Amount', 'Tax', 'Payment Fee', 'Settlement Amount', 'Settlement Tax']].assign(**{
+            'Tax Rate': (df['Tax'] / (df['Amount'] - df['Tax']) * 100).round(2),
+            'Amount Difference': df['Settlement Amount'] - df['Amount'],
+            'Tax Difference': df['Settlement Tax'] - df['Tax'],
+            **{f"{col} Squared": df[col] ** 2 for col in self.CUBE_SUMSQ}
+        })
+        keys = [df[key] for key in self.CUBE_KEYS if key in df.columns]
+
+        # Whole-frame sum/count/size reduce all columns per block, much faster than per-column aggregations
+        grouped = values.groupby(keys, observed=True, dropna=False)
+        measures = list(self.CUBE_MEASURES)
+        sums = grouped[measures + [f"{col} Squared" for col in self.CUBE_SUMSQ]].sum()
+        counts = grouped[['Payment ID'] + measures].count()
+
+        cube = pd.DataFrame({'ids': counts['Payment ID'], 'rows': grouped.size()})
+        for col, prefix in self.CUBE_MEASURES.items():
+            cube[f"{prefix}_sum"] = sums[col]
+            cube[f"{prefix}_count"] = counts[col]
+        for col in self.CUBE_SUMSQ:
+            cube[f"{self.CUBE_MEASURES[col]}_sumsq"] = sums[f"{col} Squared"]
+        return cube
+
+    def _rollup(self, by: Union[str, List[str]], status: str = None) -> pd.DataFrame:
+        """
+        Sums the cube up to the `by` dimensions, optionally for one payment status only. Groups whose
+        key is missing are dropped, as a groupby over the raw rows would.
+        """
+        cube = partial_aggregate(self, 'cube')
+        if status is not None:
+            cube = cube[cube.index.get_level_values('Payment Status') == status]
+        return cube.groupby(level=by, observed=True).sum()
+
+    def _customer_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.groupby('Customer Email').agg(
+            ids=('Payment ID', 'count'),
+            amount_sum=('Amount', 'sum'),
+            amount_count=('Amount', 'count'),
+            succeeded=('Succeeded', 'sum'),
+            fee_sum=('Payment Fee', 'sum')
+        )
+
+    def _customer_table(self, partial: pd.DataFrame) -> pd.DataFrame:
+        result = pd.DataFrame({
+            'Total Transactions': partial['ids'],
+            'Total Amount': partial['amount_sum'],
+            'Average Transaction': partial['amount_sum'] / partial['amount_count'],
+            'Successful Payments': partial['succeeded'],
+            'Total Fees Paid': partial['fee_sum']
+        }).round(2)
+        result = result.reset_index()
+
+        # Calculate success rate
+        result['Success Rate (%)'] = (result['Successful Payments'] / result['Total Transactions'] * 100).round(2)
+        return result
+
     def payment_status_summary(self) -> pd.DataFrame:
         """Summarizes successful vs failed payments with amounts and counts."""
-        result = self.df.groupby('Payment Status').agg({
-            'Payment ID': 'count',
-            'Amount': ['sum', 'mean'],
-            'Payment Fee': 'sum'
-        }).round(2)
+        partial = self._rollup('Payment Status')
 
-        # Flatten column names
-        result.columns = ['Transaction Count', 'Total Amount', 'Average Amount', 'Total Fees']
+        result = pd.DataFrame({
+            'Transaction Count': partial['ids'],
+            'Total Amount': partial['amount_sum'],
+            'Average Amount': partial['amount_sum'] / partial['amount_count'],
+            'Total Fees': partial['fee_sum']
+        }).round(2)
         result = result.reset_index()
 
         return result
 
     def payment_method_analysis(self) -> pd.DataFrame:
         """Analyzes performance by payment method (card vs UPI)."""
-        result = self.df.groupby('Payment Method').agg({
-            'Payment ID': 'count',
-            'Amount': ['sum', 'mean'],
-            'Payment Fee': ['sum', 'mean'],
-            'Payment Status': lambda x: (x == 'succeeded').sum() / len(x) * 100
-        }).round(2)
+        partial = self._rollup('Payment Method')
+        succeeded = self._rollup('Payment Method', status='succeeded')['rows'].reindex(partial.index, fill_value=0)
 
-        # Flatten column names
-        result.columns = ['Total Transactions', 'Total Amount', 'Average Amount', 'Total Fees', 'Average Fee', 'Success Rate (%)']
+        result = pd.DataFrame({
+            'Total Transactions': partial['ids'],
+            'Total Amount': partial['amount_sum'],
+            'Average Amount': partial['amount_sum'] / partial['amount_count'],
+            'Total Fees': partial['fee_sum'],
+            'Average Fee': partial['fee_sum'] / partial['fee_count'],
+            'Success Rate (%)': succeeded / partial['rows'] * 100
+        }).round(2)
         result = result.reset_index()
         return result
 
     def daily_transaction_volume(self) -> pd.DataFrame:
         """Shows daily transaction volume and revenue trends."""
-        if self.df.empty or 'Created At' not in self.df.columns:
+        cube = partial_aggregate(self, 'cube')
+        if cube.empty or 'Date' not in cube.index.names:
             return pd.DataFrame(columns=['Date', 'Transaction Count', 'Total Amount', 'Successful Amount'])
 
-        data_copy = self.df.copy()
-        data_copy['Created At'] = pd.to_datetime(data_copy['Created At'])
-        data_copy['Date'] = data_copy['Created At'].dt.date
+        daily = self._rollup('Date')
 
-        # Filter only successful payments for revenue calculation
-        successful_payments = data_copy[data_copy['Payment Status'] == 'succeeded']
+        # Only successful payments count towards revenue
+        successful = self._rollup('Date', status='succeeded')['amount_sum'].reindex(daily.index, fill_value=0)
 
-        daily_stats = data_copy.groupby('Date').agg({
-            'Payment ID': 'count',
-            'Amount': 'sum'
+        result = pd.DataFrame({
+            'Transaction Count': daily['ids'],
+            'Total Amount': daily['amount_sum'],
+            'Successful Amount': successful
         }).reset_index()
-
-        daily_successful = successful_payments.groupby('Date')['Amount'].sum().reset_index()
-        daily_successful.rename(columns={'Amount': 'Successful Amount'}, inplace=True)
-
-        result = pd.merge(daily_stats, daily_successful, on='Date', how='left')
-        result['Successful Amount'] = result['Successful Amount'].fillna(0)
-        result.rename(columns={
-            'Payment ID': 'Transaction Count',
-            'Amount': 'Total Amount'
-        }, inplace=True)
+        result['Date'] = result['Date'].dt.date
 
         return result.round(2)
 
-    def customer_analysis(self) -> pd.DataFrame:
+    def customer_analysis(self, mode: str = None) -> pd.DataFrame:
         """Analyzes customer behavior and transaction patterns."""
-        result = self.df.groupby('Customer Email').agg({
-            'Payment ID': 'count',
-            'Amount': ['sum', 'mean'],
-            'Payment Status': lambda x: (x == 'succeeded').sum(),
-            'Payment Fee': 'sum'
-        }).round(2)
+        capacity = sketch_capacity(self.approx, 'customer_analysis', mode)
+        if capacity:
+            return self._approximate_customer_analysis(capacity)
+        if self.customer_partitions:
+            return self._partitioned_customer_analysis()
 
-        # Flatten column names
-        result.columns = ['Total Transactions', 'Total Amount', 'Average Transaction', 'Successful Payments', 'Total Fees Paid']
-        result = result.reset_index()
-
-        # Calculate success rate
-        result['Success Rate (%)'] = (result['Successful Payments'] / result['Total Transactions'] * 100).round(2)
+        result = self._customer_table(self._customer_partial(self.df))
 
         # Sort by total amount descending
         result = result.sort_values('Total Amount', ascending=False)
         return result
 
+    def _approximate_customer_analysis(self, capacity: int) -> pd.DataFrame:
+        """The customer_top_k customers by total amount from a heavy-hitter sketch, with how far each total may be too high."""
+        sketch = heavy_hitters(iter_prepared_frames(self), ['Customer Email'], weight='Amount', capacity=capacity)
+
+        result = sketch.top(self.customer_top_k).rename(columns={'count': 'Total Amount', 'error': 'Error Bound'})
+        return result.rename_axis('Customer Email').reset_index().round(2)
+
+    def _partitioned_customer_analysis(self) -> pd.DataFrame:
+        """customer_analysis with per-customer state spilled to disk; returns only the top customers."""
+        partials = (self._customer_partial(frame) for frame in iter_prepared_frames(self))
+        top = None
+
+        # Write the full table to a temporary file and publish it only once it is complete
+        tmp_path = f"{self.customer_table}.tmp" if self.customer_table else os.devnull
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as table:
+                for partial in spill_partitioned(partials, self.customer_partitions, self._CUSTOMER_PARTIAL):
+                    result = self._customer_table(partial)
+                    result.to_csv(table, header=top is None, index=False)
+                    top = result if top is None else pd.concat([top, result])
+                    top = top.nlargest(self.customer_top_k, 'Total Amount')
+            if self.customer_table:
+                os.replace(tmp_path, self.customer_table)
+        finally:
+            if self.customer_table and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if top is None:
+            return pd.DataFrame(columns=self.CUSTOMER_COLUMNS)
+        return top.sort_values('Total Amount', ascending=False)
+
     def fee_analysis(self) -> pd.DataFrame:
         """Analyzes payment processing fees and their impact."""
-        successful_payments = self.df[self.df['Payment Status'] == 'succeeded'].copy()
+        successful_payments = self._rollup('Payment Status', status='succeeded')
 
         if successful_payments.empty:
             return pd.DataFrame(columns=['Metric', 'Value'])
 
         # Calculate fee statistics
-        total_revenue = successful_payments['Amount'].sum()
-        total_fees = successful_payments['Payment Fee'].sum()
+        total_revenue = successful_payments['amount_sum'].sum()
+        total_fees = successful_payments['fee_sum'].sum()
         fee_percentage = (total_fees / total_revenue * 100) if total_revenue > 0 else 0
-        avg_fee_per_transaction = successful_payments['Payment Fee'].mean()
+        avg_fee_per_transaction = total_fees / successful_payments['fee_count'].sum()
 
         result = pd.DataFrame({
             'Metric': [
@@ -138,18 +344,15 @@ class Generator:
         if self.df.empty or 'Created At' not in self.df.columns:
             return pd.DataFrame(columns=['Hour', 'Transaction Count', 'Success Rate (%)', 'Average Amount'])
 
-        data_copy = self.df.copy()
-        data_copy['Created At'] = pd.to_datetime(data_copy['Created At'])
-        data_copy['Hour'] = data_copy['Created At'].dt.hour
-
-        result = data_copy.groupby('Hour').agg({
+        result = self.df[['Payment ID', 'Amount', 'Succeeded']].groupby(self.df['Hour']).agg({
             'Payment ID': 'count',
             'Amount': 'mean',
-            'Payment Status': lambda x: (x == 'succeeded').sum() / len(x) * 100
-        }).round(2)
+            'Succeeded': 'mean'
+        })
 
         result.columns = ['Transaction Count', 'Average Amount', 'Success Rate (%)']
-        result = result.reset_index()
+        result['Success Rate (%)'] = result['Success Rate (%)'] * 100
+        result = result.round(2).reset_index()
 
         # Sort by hour
         result = result.sort_values('Hour')
@@ -157,46 +360,67 @@ class Generator:
 
     def failed_payment_analysis(self) -> pd.DataFrame:
         """Analyzes failed payments to identify patterns."""
-        failed_payments = self.df[self.df['Payment Status'] == 'failed'].copy()
+        failed = self._rollup('Payment Method', status='failed')
 
-        if failed_payments.empty:
+        if failed.empty:
             return pd.DataFrame({'Message': ['No failed payments found']})
 
-        result = failed_payments.groupby('Payment Method').agg({
-            'Payment ID': 'count',
-            'Amount': ['sum', 'mean'],
-            'Customer Email': 'nunique'
-        }).round(2)
+        # Distinct customers cannot be summed up from the cube, so they come from the failed rows
+        affected_customers = self.df.loc[self.df['Failed'], ['Payment Method', 'Customer Email']].groupby(
+            'Payment Method', observed=True)['Customer Email'].nunique()
 
-        # Flatten column names
-        result.columns = ['Failed Count', 'Lost Revenue', 'Average Failed Amount', 'Affected Customers']
+        result = pd.DataFrame({
+            'Failed Count': failed['ids'],
+            'Lost Revenue': failed['amount_sum'],
+            'Average Failed Amount': failed['amount_sum'] / failed['amount_count'],
+            'Affected Customers': affected_customers
+        }).round(2)
         result = result.reset_index()
 
         return result
 
-    def wallet_balance_trend(self) -> pd.DataFrame:
+    def _wallet_rows(self) -> pd.DataFrame:
+        """Successful payments that carry a wallet balance."""
+        return self.df.loc[
+            self.df['Succeeded'] &
+            self.df['Net Amount In Wallet After Fees'].notna() &
+            self.df['Created At'].notna(),
+            ['Payment ID', 'Created At', 'Net Amount In Wallet After Fees']
+        ]
+
+    def _build_wallet_timeline(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Wallet rows sorted by time and indexed by 'Created At', with each row's change in balance."""
+        timeline = rows.sort_values('Created At').set_index('Created At')
+        balance = timeline['Net Amount In Wallet After Fees']
+        return timeline.assign(**{'Balance Change': balance - balance.shift(1)})
+
+    def wallet_balance_trend(self, window: int = None, start: str = None, end: str = None) -> pd.DataFrame:
         """Tracks wallet balance changes over time (only for successful payments)."""
         if self.df.empty or 'Net Amount In Wallet After Fees' not in self.df.columns:
             return pd.DataFrame(columns=['Transaction', 'Wallet Balance', 'Balance Change'])
 
-        # Filter successful payments with wallet balance data
-        successful_with_balance = self.df[
-            (self.df['Payment Status'] == 'succeeded') &
-            (self.df['Net Amount In Wallet After Fees'].notna())
-            ].copy()
+        if window is None:
+            window = self.wallet_window
+        start = start if start is not None else self.wallet_start
+        end = end if end is not None else self.wallet_end
 
-        if successful_with_balance.empty:
-            return pd.DataFrame({'Message': ['No wallet balance data available']})
+        timeline = self._wallet_timeline
+        if timeline is None:
+            rows = self._wallet_rows()
+            if start is None and end is None:
+                # Only the latest window (plus the row before it, for the first change) needs sorting
+                rows = rows.nlargest(window + 1, 'Created At')
+            timeline = self._build_wallet_timeline(rows)
 
-        # Sort by created date
-        successful_with_balance['Created At'] = pd.to_datetime(successful_with_balance['Created At'])
-        successful_with_balance = successful_with_balance.sort_values('Created At')
+        # The index is sorted, so a date range is a binary search rather than a scan
+        if start is not None or end is not None:
+            timeline = timeline.loc[start:end]
 
-        # Calculate balance changes
-        successful_with_balance['Previous Balance'] = successful_with_balance['Net Amount In Wallet After Fees'].shift(1)
-        successful_with_balance['Balance Change'] = successful_with_balance['Net Amount In Wallet After Fees'] - successful_with_balance['Previous Balance']
+        if timeline.empty:
+            return pd.DataFrame({'Message': ['No wallet balance data available']})
 
-        result = successful_with_balance[['Payment ID', 'Created At', 'Net Amount In Wallet After Fees', 'Balance Change']].copy()
+        result = timeline.tail(window).reset_index()
+        result = result[['Payment ID', 'Created At', 'Net Amount In Wallet After Fees', 'Balance Change']]
         result.rename(columns={
             'Payment ID': 'Transaction',
             'Created At': 'Date',
@@ -208,35 +432,33 @@ class Generator:
         result['Balance Change'] = result['Balance Change'].round(2)
         result['Date'] = result['Date'].dt.strftime('%Y-%m-%d %H:%M')
 
-        return result.tail(10)  # Show last 10 transactions
+        return result
 
     def tax_analysis(self) -> pd.DataFrame:
         """Analyzes tax collection and rates across transactions."""
-        successful_payments = self.df[self.df['Payment Status'] == 'succeeded'].copy()
+        successful_payments = self._rollup('Payment Status', status='succeeded')
 
         if successful_payments.empty:
             return pd.DataFrame({'Message': ['No successful payments for tax analysis']})
 
         # Calculate tax statistics
-        successful_payments['Tax Rate (%)'] = (successful_payments['Tax'] / (successful_payments['Amount'] - successful_payments['Tax']) * 100).round(2)
-
-        result = successful_payments.groupby('Payment Method').agg({
-            'Tax': ['sum', 'mean'],
-            'Tax Rate (%)': 'mean',
-            'Amount': 'sum'
+        by_method = self._rollup('Payment Method', status='succeeded')
+        result = pd.DataFrame({
+            'Total Tax Collected': by_method['tax_sum'],
+            'Average Tax per Transaction': by_method['tax_sum'] / by_method['tax_count'],
+            'Average Tax Rate (%)': by_method['tax_rate_sum'] / by_method['tax_rate_count'],
+            'Total Gross Amount': by_method['amount_sum']
         }).round(2)
-
-        # Flatten column names
-        result.columns = ['Total Tax Collected', 'Average Tax per Transaction', 'Average Tax Rate (%)', 'Total Gross Amount']
         result = result.reset_index()
 
         # Add overall summary row
+        total = successful_payments.sum()
         total_row = pd.DataFrame({
             'Payment Method': ['TOTAL'],
-            'Total Tax Collected': [successful_payments['Tax'].sum()],
-            'Average Tax per Transaction': [successful_payments['Tax'].mean()],
-            'Average Tax Rate (%)': [successful_payments['Tax Rate (%)'].mean()],
-            'Total Gross Amount': [successful_payments['Amount'].sum()]
+            'Total Tax Collected': [total['tax_sum']],
+            'Average Tax per Transaction': [total['tax_sum'] / total['tax_count']],
+            'Average Tax Rate (%)': [total['tax_rate_sum'] / total['tax_rate_count']],
+            'Total Gross Amount': [total['amount_sum']]
         })
 
         result = pd.concat([result, total_row], ignore_index=True)
@@ -244,30 +466,22 @@ class Generator:
 
     def settlement_analysis(self) -> pd.DataFrame:
         """Analyzes settlement amounts vs original amounts."""
-        successful_payments = self.df[self.df['Payment Status'] == 'succeeded'].copy()
-
-        if successful_payments.empty:
+        if self._rollup('Payment Status', status='succeeded').empty:
             return pd.DataFrame({'Message': ['No successful payments for settlement analysis']})
 
-        # Check if settlement amounts differ from original amounts
-        successful_payments['Amount Difference'] = successful_payments['Settlement Amount'] - successful_payments['Amount']
-        successful_payments['Tax Difference'] = successful_payments['Settlement Tax'] - successful_payments['Tax']
-
-        result = successful_payments.groupby('Settlement Currency').agg({
-            'Amount': 'sum',
-            'Settlement Amount': 'sum',
-            'Amount Difference': ['sum', 'mean'],
-            'Tax': 'sum',
-            'Settlement Tax': 'sum',
-            'Tax Difference': ['sum', 'mean'],
-            'Payment ID': 'count'
+        # Differences between settlement and original amounts are summed per row in the cube
+        by_currency = self._rollup('Settlement Currency', status='succeeded')
+        result = pd.DataFrame({
+            'Original Amount': by_currency['amount_sum'],
+            'Settlement Amount': by_currency['settlement_amount_sum'],
+            'Total Amount Diff': by_currency['amount_diff_sum'],
+            'Avg Amount Diff': by_currency['amount_diff_sum'] / by_currency['amount_diff_count'],
+            'Original Tax': by_currency['tax_sum'],
+            'Settlement Tax': by_currency['settlement_tax_sum'],
+            'Total Tax Diff': by_currency['tax_diff_sum'],
+            'Avg Tax Diff': by_currency['tax_diff_sum'] / by_currency['tax_diff_count'],
+            'Transaction Count': by_currency['ids']
         }).round(2)
-
-        # Flatten column names
-        result.columns = [
-            'Original Amount', 'Settlement Amount', 'Total Amount Diff', 'Avg Amount Diff',
-            'Original Tax', 'Settlement Tax', 'Total Tax Diff', 'Avg Tax Diff', 'Transaction Count'
-        ]
         result = result.reset_index()
 
         return result
@@ -0,0 +1,230 @@
+import pandas as pd
+from typing import Dict, Iterator, List, Union
+
+from datasets import as_flags, iter_csv_chunks, spill_partitioned
+
+class Generator:
+    # Columns this analyzer reads from the ledger (account summary) export, and how to type them
+    SCHEMA = {
+        'usecols': ['Ledger Entry ID', 'Event Type', 'Amount', 'Is Credit', 'Reference Object ID'],
+        'null': 'NULL',
+        'key': 'Ledger Entry ID'
+    }
+
+    # Columns read from the exports the ledger entries point at
+    PAYMENTS_SCHEMA = {
+        'usecols': ['Payment ID', 'Payment Status', 'Settlement Amount', 'Settlement Tax', 'Payment Fee'],
+        'null': 'NULL',
+        'key': 'Payment ID'
+    }
+    REFUNDS_SCHEMA = {
+        'usecols': ['Refund ID', 'Refund Settlement Amount', 'Refund Settlement Tax', 'Refund Fee'],
+        'null': 'NULL',
+        'key': 'Refund ID'
+    }
+
+    # Ledger event type -> the ledger_<name> column its amounts are summed into
+    LEDGER_EVENTS = {
+        'payment': 'payment',
+        'tax': 'tax',
+        'payment_fees': 'fee',
+        'refund': 'refund',
+        'tax_reversal': 'refund_tax',
+        'refund_fees': 'refund_fee',
+    }
+
+    # Amount checks: label -> (ledger column, export column, column counting the export's rows)
+    CHECKS = {
+        'Payment Amount': ('ledger_payment', 'expected_payment', 'payment_rows'),
+        'Payment Tax': ('ledger_tax', 'expected_tax', 'payment_rows'),
+        'Payment Fee': ('ledger_fee', 'expected_fee', 'payment_rows'),
+        'Refund Amount': ('ledger_refund', 'expected_refund', 'refund_rows'),
+        'Refund Tax': ('ledger_refund_tax', 'expected_refund_tax', 'refund_rows'),
+        'Refund Fee': ('ledger_refund_fee', 'expected_refund_fee', 'refund_rows'),
+    }
+
+    # Per reference object partial aggregates, all merged by summing
+    _PARTIAL = dict.fromkeys([
+        'ledger_entries', 'ledger_payments', 'ledger_net',
+        *(f"ledger_{name}" for name in LEDGER_EVENTS.values()),
+        'payment_rows', 'payment_succeeded', 'expected_payment', 'expected_tax', 'expected_fee',
+        'refund_rows', 'expected_refund', 'expected_refund_tax', 'expected_refund_fee'
+    ], 'sum')
+
+    KEY = 'Reference Object ID'
+
+    # Columns of the issue tables
+    UNMATCHED_COLUMNS = ['Reference Object ID', 'Ledger Entries', 'Net Amount']
+    MISSING_CREDIT_COLUMNS = ['Payment ID', 'Settlement Amount', 'Payment Fee']
+    MISMATCH_COLUMNS = ['Reference Object ID', 'Check', 'Ledger Amount', 'Export Amount', 'Difference']
+
+    # The ledger is never held in memory, so every analysis reads the reconciliation done at construction
+    STREAMING_ANALYSES = ('reconciliation_summary', 'unmatched_ledger_entries',
+                          'payments_without_ledger_credit', 'amount_mismatches')
+
+    # Every export is streamed in chunks, never loaded whole through the dataset registry
+    STREAMS_EXPORTS = True
+
+    # Differences up to half a cent are rounding, not mismatches
+    TOLERANCE = 0.005
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", payments_csv: Union[str, List[str]] = None,
+                 refunds_csv: Union[str, List[str]] = None, chunksize: int = 1_000_000,
+                 partitions: int = 8, top_k: int = 100):
+        """
+        Initialize with the ledger as a CSV path (a path, glob pattern or list of exports) or a
+        DataFrame, and the payments and refunds exports its 'Reference Object ID' points at.
+
+        All three exports are read in chunks of `chunksize` rows and aggregated per reference
+        object; the aggregates are hash-partitioned to `partitions` files on disk and joined one
+        partition at a time, so memory is bounded by a chunk plus a partition. Only the `top_k`
+        largest issues of each kind are kept for the report; the counts cover all of them.
+        """
+        if df is None and not csv_path:
+            raise ValueError("Either csv_path or df must be provided")
+
+        self.report_title = report_title
+        self.top_k = top_k
+
+        # The ledger is never held in memory as a whole
+        self.df = None
+        self.row_count = 0
+
+        ledger = self._frames(df, csv_path, self.SCHEMA, chunksize)
+        partials = self._partials(ledger, payments_csv, refunds_csv, chunksize)
+        self._reconcile(spill_partitioned(partials, partitions, self._PARTIAL))
+
+    @staticmethod
+    def _frames(df: pd.DataFrame, csv_path: Union[str, List[str]], schema: Dict, chunksize: int) -> Iterator[pd.DataFrame]:
+        if df is not None:
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+        elif csv_path:
+            yield from iter_csv_chunks(csv_path, schema, chunksize)
+
+    def _partials(self, ledger: Iterator[pd.DataFrame], payments_csv, refunds_csv, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Per reference object aggregates of every chunk of the three exports, with the same columns."""
+        builders = (
+            (ledger, self._ledger_partial),
+            (self._frames(None, payments_csv, self.PAYMENTS_SCHEMA, chunksize), self._payments_partial),
+            (self._frames(None, refunds_csv, self.REFUNDS_SCHEMA, chunksize), self._refunds_partial),
+        )
+        for frames, builder in builders:
+            for chunk in frames:
+                yield builder(chunk).reindex(columns=list(self._PARTIAL), fill_value=0)
+
+    def _ledger_partial(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        self.row_count += len(chunk)
+        amount = pd.to_numeric(chunk['Amount'], errors='coerce').fillna(0)
+        events = chunk['Event Type']
+
+        values = pd.DataFrame({
+            'ledger_entries': 1,
+            'ledger_payments': events == 'payment',
+            'ledger_net': amount.where(as_flags(chunk['Is Credit']), -amount),
+            **{f"ledger_{name}": amount.where(events == event, 0) for event, name in self.LEDGER_EVENTS.items()}
+        }, index=chunk.index)
+        # Entries without a reference stay as one group, so they are reported as unmatched
+        return values.groupby(chunk[self.KEY].rename(self.KEY), dropna=False).sum()
+
+    def _payments_partial(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        # Only successful payments are expected to reach the ledger
+        succeeded = chunk['Payment Status'] == 'succeeded'
+        values = pd.DataFrame({
+            'payment_rows': 1,
+            'payment_succeeded': succeeded,
+            'expected_payment': pd.to_numeric(chunk['Settlement Amount'], errors='coerce').where(succeeded, 0),
+            'expected_tax': pd.to_numeric(chunk['Settlement Tax'], errors='coerce').where(succeeded, 0),
+            'expected_fee': pd.to_numeric(chunk['Payment Fee'], errors='coerce').where(succeeded, 0)
+        }, index=chunk.index)
+        return values.groupby(chunk['Payment ID'].rename(self.KEY)).sum()
+
+    def _refunds_partial(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        values = pd.DataFrame({
+            'refund_rows': 1,
+            'expected_refund': pd.to_numeric(chunk['Refund Settlement Amount'], errors='coerce'),
+            'expected_refund_tax': pd.to_numeric(chunk['Refund Settlement Tax'], errors='coerce'),
+            'expected_refund_fee': pd.to_numeric(chunk['Refund Fee'], errors='coerce')
+        }, index=chunk.index)
+        return values.groupby(chunk['Refund ID'].rename(self.KEY)).sum()
+
+    def _reconcile(self, partitions: Iterator[pd.DataFrame]):
+        """Joins each merged partition, counting every issue and keeping the largest ones."""
+        self._counts = dict.fromkeys([
+            'Reference Objects in Ledger', 'Matched to Payments', 'Matched to Refunds',
+            'Unmatched Ledger Entries', 'Succeeded Payments without Ledger Credit',
+            'Refunds without Ledger Entries', 'Amount Mismatches'
+        ], 0)
+        self._unmatched = pd.DataFrame(columns=self.UNMATCHED_COLUMNS)
+        self._missing_credit = pd.DataFrame(columns=self.MISSING_CREDIT_COLUMNS)
+        self._mismatches = pd.DataFrame(columns=self.MISMATCH_COLUMNS)
+
+        for merged in partitions:
+            in_ledger = merged['ledger_entries'] > 0
+            in_payments = merged['payment_rows'] > 0
+            in_refunds = merged['refund_rows'] > 0
+
+            unmatched = merged[in_ledger & ~in_payments & ~in_refunds]
+            missing_credit = merged[(merged['payment_succeeded'] > 0) & (merged['ledger_payments'] == 0)]
+            # A payment missing its ledger credit is reported once, not again as a mismatch
+            mismatches = self._mismatches_in(merged[in_ledger & ~merged.index.isin(missing_credit.index)])
+
+            self._counts['Reference Objects in Ledger'] += int(in_ledger.sum())
+            self._counts['Matched to Payments'] += int((in_ledger & in_payments).sum())
+            self._counts['Matched to Refunds'] += int((in_ledger & in_refunds).sum())
+            self._counts['Unmatched Ledger Entries'] += int(unmatched['ledger_entries'].sum())
+            self._counts['Succeeded Payments without Ledger Credit'] += len(missing_credit)
+            self._counts['Refunds without Ledger Entries'] += int((in_refunds & ~in_ledger).sum())
+            self._counts['Amount Mismatches'] += len(mismatches)
+
+            self._unmatched = self._largest(self._unmatched, pd.DataFrame({
+                'Reference Object ID': unmatched.index,
+                'Ledger Entries': unmatched['ledger_entries'].to_numpy(),
+                'Net Amount': unmatched['ledger_net'].to_numpy()
+            }), 'Net Amount')
+            self._missing_credit = self._largest(self._missing_credit, pd.DataFrame({
+                'Payment ID': missing_credit.index,
+                'Settlement Amount': missing_credit['expected_payment'].to_numpy(),
+                'Payment Fee': missing_credit['expected_fee'].to_numpy()
+            }), 'Settlement Amount')
+            self._mismatches = self._largest(self._mismatches, mismatches, 'Difference')
+
+    def _mismatches_in(self, merged: pd.DataFrame) -> pd.DataFrame:
+        """One row per reference object and check whose ledger total differs from its export."""
+        found = []
+        for check, (ledger_col, export_col, rows_col) in self.CHECKS.items():
+            difference = merged[ledger_col] - merged[export_col]
+            rows = merged[(merged[rows_col] > 0) & (difference.abs() > self.TOLERANCE)]
+            found.append(pd.DataFrame({
+                'Reference Object ID': rows.index,
+                'Check': check,
+                'Ledger Amount': rows[ledger_col].to_numpy(),
+                'Export Amount': rows[export_col].to_numpy(),
+                'Difference': difference[rows.index].to_numpy()
+            }))
+        return pd.concat(found, ignore_index=True)
+
+    def _largest(self, kept: pd.DataFrame, new: pd.DataFrame, column: str) -> pd.DataFrame:
+        """The top_k rows of kept and new by absolute value of column."""
+        combined = new if kept.empty else pd.concat([kept, new], ignore_index=True)
+        return combined.loc[combined[column].abs().nlargest(self.top_k).index].reset_index(drop=True)
+
+    def reconciliation_summary(self) -> pd.DataFrame:
+        """Counts ledger entries matched to payments and refunds, and every kind of reconciliation issue."""
+        return pd.DataFrame({
+            'Metric': ['Ledger Entries', *self._counts],
+            'Value': [self.row_count, *self._counts.values()]
+        })
+
+    def unmatched_ledger_entries(self) -> pd.DataFrame:
+        """Ledger references that match no payment or refund, largest net amount first."""
+        return self._unmatched.round(2)
+
+    def payments_without_ledger_credit(self) -> pd.DataFrame:
+        """Successful payments with no payment credit in the ledger, largest first."""
+        return self._missing_credit.round(2)
+
+    def amount_mismatches(self) -> pd.DataFrame:
+        """Ledger totals that differ from the payment or refund they reference, largest difference first."""
+        return self._mismatches.round(2)
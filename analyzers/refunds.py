@@ -1,22 +1,110 @@
 import pandas as pd
+from typing import Dict, List, Union
+
+from datasets import (
+    categorize, enable_copy_on_write, iter_csv_chunks, iter_prepared_frames, load_prepared, load_streaming
+)
+from sketches import QuantileSketch, heavy_hitters, percentile_table, quantile_sketch, sketch_capacity
+from utils import merge_partials
 
 class Generator:
-    def __init__(self, csv_path: str = None, df: pd.DataFrame = None, report_title = "Report Analysis"):
-        """Initialize with either a CSV path or a DataFrame."""
+    # Columns this analyzer reads from the export, and how to type them
+    SCHEMA = {
+        'usecols': [
+            'Refund ID', 'Payment ID', 'Refund Created At', 'Customer Name', 'Customer Email', 'Refund Type', 'Refund Reason',
+            'Refund Amount', 'Refund Currency', 'Refund Settlement Amount', 'Refund Settlement Tax',
+            'Refund Fee', 'Refund Status', 'Payment Method', 'Payment Method Type'
+        ],
+        'dtypes': {
+            'Refund Amount': 'float64', 'Refund Settlement Amount': 'float64',
+            'Refund Settlement Tax': 'float64', 'Refund Fee': 'float64',
+            'Refund Status': 'category', 'Refund Type': 'category', 'Refund Currency': 'category',
+            'Payment Method': 'category', 'Payment Method Type': 'category'
+        },
+        'dates': ['Refund Created At'],
+        'null': 'NULL',
+        'key': 'Refund ID'
+    }
+
+    # Columns read from the payments export the refunds are linked to (payments_csv)
+    PAYMENTS_SCHEMA = {
+        'usecols': ['Payment ID', 'Created At', 'Payment Status', 'Payment Method', 'Billing Country', 'Currency'],
+        'dates': ['Created At'],
+        'null': 'NULL',
+        'key': 'Payment ID'
+    }
+
+    # Payment columns refund rates are broken down by
+    RATE_DIMENSIONS = ['Payment Method', 'Billing Country', 'Currency']
+
+    # Streaming mode keeps no pre-aggregated tables: its analyses are one-pass sketches over the export
+    _PARTIALS = {}
+
+    # Analyses that also work in streaming mode (chunksize=...)
+    STREAMING_ANALYSES = ('refund_amount_percentiles',)
+
+    # Analyses that can run from a Space-Saving sketch (approx=...), which also streams
+    APPROX_ANALYSES = ('refund_reasons_analysis', 'customer_refund_patterns')
+
+    # Payment-to-refund latency ranges, in hours
+    # Refunds timestamped before their payment (clock skew, backdated imports) get their own range,
+    # so the distribution counts every linked refund the percentiles do
+    LATENCY_BINS = [float('-inf'), 0, 1, 24, 24 * 7, 24 * 30, float('inf')]
+    LATENCY_LABELS = ['Before payment', '< 1 hour', '1-24 hours', '1-7 days', '7-30 days', '30+ days']
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", sidecar: str = None, chunksize: int = None,
+                 copy: bool = True, approx: Union[List[str], Dict[str, int]] = None,
+                 payments_csv: Union[str, List[str]] = None, payments_chunksize: int = 1_000_000):
+        """
+        Initialize with either a CSV path (a path, glob pattern or list of exports) or a DataFrame.
+
+        sidecar: 'feather' or 'parquet' to keep the prepared data next to the CSV and reuse it
+        on later runs until the CSV changes (when the CSV is loaded whole).
+        chunksize: stream the CSV in chunks of this many rows instead of loading it whole. Only
+        STREAMING_ANALYSES and the approx analyses are available in this mode, self.df is None
+        and the export is never held in memory; payments_csv is not linked.
+        copy: with copy=False the Generator wraps df without copying it. Copy-on-write is turned
+        on, so the caller's frame is left unchanged when columns are re-typed or added.
+        approx: analyses to run approximately in one pass with fixed memory (a Space-Saving
+        sketch, see sketches.py), as a list or as {analysis: sketch capacity}. Supported:
+        refund_reasons_analysis and customer_refund_patterns, which then list their top_n rows
+        with error bounds. With chunksize they stream the export, so memory stays bounded by a
+        chunk plus the sketch; otherwise they only bound the size of their result.
+        payments_csv: the payments export (a path, glob pattern or list) the refunds' 'Payment ID'
+        points at. It is read in chunks of `payments_chunksize` rows to add refund rates per
+        payment method, country and currency and the time from payment to refund.
+        """
+        self.approx = approx if isinstance(approx, dict) else dict.fromkeys(approx or ())
+
         if df is not None:
-            self.df = df.copy()
+            if not copy:
+                enable_copy_on_write()
+            self.df = df.copy(deep=copy)
+            # Clean and prepare data
+            self._prepare_data()
+        elif csv_path and chunksize:
+            load_streaming(self, csv_path, chunksize)
         elif csv_path:
-            self.df = pd.read_csv(csv_path)
+            load_prepared(self, csv_path, sidecar=sidecar)
         else:
             raise ValueError("Either csv_path or df must be provided")
 
-        self.report_title = report_title
+        # The approximate analyses stream the export again, so they work without self.df
+        self.STREAMING_ANALYSES = self.STREAMING_ANALYSES + tuple(name for name in self.APPROX_ANALYSES if name in self.approx)
+
+        self._payment_rates = None
+        self._payment_created = None
+        if payments_csv and self.df is not None:
+            self._link_payments(payments_csv, payments_chunksize)
 
-        # Clean and prepare data
-        self._prepare_data()
+        self.report_title = report_title
 
     def _prepare_data(self):
         """Clean and prepare the refund dataset for analysis."""
+        # Store low-cardinality text columns as categoricals
+        categorize(self.df, self.SCHEMA)
+
         # Ensure numeric columns are properly typed
         numeric_columns = ['Refund Amount', 'Refund Settlement Amount', 'Refund Settlement Tax', 'Refund Fee']
         for col in numeric_columns:
@@ -44,12 +132,59 @@ class Generator:
             self.df['Refund Year'] = self.df['Refund Created At'].dt.year
             self.df['Refund Day'] = self.df['Refund Created At'].dt.day_name()
 
+    def _link_payments(self, payments_csv: Union[str, List[str]], chunksize: int):
+        """
+        Streams the payments export once, looking every payment up in a hash index of the refunded
+        Payment IDs. Only counts per RATE_DIMENSIONS and the creation time of refunded payments are
+        kept, so the join is linear in both exports and memory is bounded by a chunk plus the refunds.
+        """
+        ids = self.df['Payment ID'] if 'Payment ID' in self.df.columns else pd.Series(dtype='str')
+        refunded = pd.Index(ids.dropna().unique())
+
+        rates = None
+        created = [pd.Series(dtype='datetime64[ns]')]
+        for chunk in iter_csv_chunks(payments_csv, self.PAYMENTS_SCHEMA, chunksize):
+            # Only successful payments can be refunded
+            chunk = chunk[chunk['Payment Status'] == 'succeeded']
+            is_refunded = refunded.get_indexer(chunk['Payment ID']) >= 0
+
+            counts = pd.DataFrame({'payments': 1, 'refunded_payments': is_refunded.astype('int64')}, index=chunk.index)
+            partial = counts.groupby([chunk[col] for col in self.RATE_DIMENSIONS], dropna=False).sum()
+            rates = merge_partials(rates, partial, {'payments': 'sum', 'refunded_payments': 'sum'})
+
+            linked = chunk[is_refunded]
+            created.append(pd.to_datetime(linked['Created At'], errors='coerce').set_axis(linked['Payment ID']))
+
+        created = pd.concat(created)
+        self._payment_rates = rates
+        self._payment_created = created[~created.index.duplicated(keep='last')]
+
+    def _refund_rates(self, column: str) -> pd.DataFrame:
+        """Succeeded payments and how many of them were refunded, per value of a payments column."""
+        if self._payment_rates is None:
+            return pd.DataFrame(columns=[column, 'Payments', 'Refunded Payments', 'Refund Rate (%)'])
+
+        result = self._payment_rates.groupby(level=column, dropna=False).sum()
+        result['refund_rate'] = (result['refunded_payments'] / result['payments'] * 100).round(2)
+        result = result.sort_values('payments', ascending=False).reset_index()
+
+        result.columns = [column, 'Payments', 'Refunded Payments', 'Refund Rate (%)']
+        return result
+
+    def _refund_latency(self) -> pd.Series:
+        """Hours from each linked payment's creation to its refund."""
+        if self._payment_created is None or self._payment_created.empty or self.df.empty:
+            return pd.Series(dtype='float64')
+
+        paid_at = self._payment_created.reindex(self.df['Payment ID']).to_numpy()
+        return ((self.df['Refund Created At'] - paid_at).dt.total_seconds() / 3600).dropna()
+
     def refund_status_summary(self) -> pd.DataFrame:
         """Summary of refunds by status with amounts and counts."""
         if self.df.empty:
             return pd.DataFrame(columns=['Refund Status', 'Count', 'Total Amount', 'Average Amount'])
 
-        result = self.df.groupby('Refund Status').agg({
+        result = self.df.groupby('Refund Status', observed=True).agg({
             'Refund ID': 'count',
             'Refund Amount': ['sum', 'mean']
         }).reset_index()
@@ -65,7 +200,7 @@ class Generator:
         if self.df.empty:
             return pd.DataFrame(columns=['Refund Type', 'Count', 'Total Amount', 'Percentage of Total'])
 
-        result = self.df.groupby('Refund Type').agg({
+        result = self.df.groupby('Refund Type', observed=True).agg({
             'Refund ID': 'count',
             'Refund Amount': 'sum'
         }).reset_index()
@@ -83,7 +218,7 @@ class Generator:
         if self.df.empty:
             return pd.DataFrame(columns=['Payment Method', 'Payment Method Type', 'Count', 'Total Amount', 'Avg Amount'])
 
-        result = self.df.groupby(['Payment Method', 'Payment Method Type']).agg({
+        result = self.df.groupby(['Payment Method', 'Payment Method Type'], observed=True).agg({
             'Refund ID': 'count',
             'Refund Amount': ['sum', 'mean']
         }).reset_index()
@@ -126,8 +261,15 @@ class Generator:
         result = pd.DataFrame(metrics, columns=['Metric', 'Value'])
         return result
 
-    def refund_reasons_analysis(self) -> pd.DataFrame:
+    def refund_reasons_analysis(self, mode: str = None, top_n: int = 10) -> pd.DataFrame:
         """Top refund reasons with frequency and amounts."""
+        capacity = sketch_capacity(self.approx, 'refund_reasons_analysis', mode)
+        if capacity:
+            sketch = heavy_hitters(iter_prepared_frames(self), ['Refund Reason'], capacity=capacity)
+            result = sketch.top(top_n).astype(int).rename(columns={'count': 'Count', 'error': 'Error Bound'})
+            result['Percentage of Cases'] = (result['Count'] / sketch.total * 100).round(2) if sketch.total else 0.0
+            return result.rename_axis('Refund Reason').reset_index()
+
         if self.df.empty:
             return pd.DataFrame(columns=['Refund Reason', 'Count', 'Total Amount', 'Avg Amount', 'Percentage of Cases'])
 
@@ -148,8 +290,14 @@ class Generator:
 
         return result
 
-    def customer_refund_patterns(self) -> pd.DataFrame:
+    def customer_refund_patterns(self, mode: str = None, top_n: int = 10) -> pd.DataFrame:
         """Analysis of customers with multiple refunds."""
+        capacity = sketch_capacity(self.approx, 'customer_refund_patterns', mode)
+        if capacity:
+            sketch = heavy_hitters(iter_prepared_frames(self), ['Customer Name', 'Customer Email'], capacity=capacity)
+            result = sketch.top(top_n).astype(int).rename(columns={'count': 'Refund Count', 'error': 'Error Bound'})
+            return result.reset_index()
+
         if self.df.empty:
             return pd.DataFrame(columns=['Customer Name', 'Customer Email', 'Refund Count', 'Total Refunded', 'Avg Refund'])
 
@@ -227,7 +375,7 @@ class Generator:
         if self.df.empty:
             return pd.DataFrame(columns=['Currency', 'Count', 'Total Amount', 'Avg Amount'])
 
-        result = self.df.groupby('Refund Currency').agg({
+        result = self.df.groupby('Refund Currency', observed=True).agg({
             'Refund ID': 'count',
             'Refund Amount': ['sum', 'mean']
         }).reset_index()
@@ -238,6 +386,45 @@ class Generator:
 
         return result
 
+    def refund_amount_percentiles(self) -> pd.DataFrame:
+        """P50, P90 and P99 refund amounts from a quantile sketch built chunk by chunk (within 1%)."""
+        sketch = quantile_sketch(iter_prepared_frames(self), 'Refund Amount')
+        return percentile_table({'Refund Amount': sketch})
+
+    def refund_rate_by_payment_method(self) -> pd.DataFrame:
+        """Share of successful payments refunded, per payment method (needs payments_csv)."""
+        return self._refund_rates('Payment Method')
+
+    def refund_rate_by_country(self) -> pd.DataFrame:
+        """Share of successful payments refunded, per billing country (needs payments_csv)."""
+        return self._refund_rates('Billing Country')
+
+    def refund_rate_by_currency(self) -> pd.DataFrame:
+        """Share of successful payments refunded, per payment currency (needs payments_csv)."""
+        return self._refund_rates('Currency')
+
+    def refund_latency_distribution(self) -> pd.DataFrame:
+        """Time from payment to refund, by range (needs payments_csv)."""
+        latency = self._refund_latency()
+        if latency.empty:
+            return pd.DataFrame(columns=['Time to Refund', 'Count', 'Percentage'])
+
+        latency_range = pd.cut(latency, bins=self.LATENCY_BINS, labels=self.LATENCY_LABELS, right=False)
+        result = latency_range.value_counts(sort=False).reset_index()
+        result.columns = ['Time to Refund', 'Count']
+        result['Percentage'] = (result['Count'] / result['Count'].sum() * 100).round(2)
+        return result
+
+    def refund_latency_percentiles(self) -> pd.DataFrame:
+        """P50, P90 and P99 days from payment to refund, from a quantile sketch (needs payments_csv)."""
+        latency = self._refund_latency()
+        if latency.empty:
+            return pd.DataFrame(columns=['Percentile', 'Days to Refund'])
+
+        sketch = QuantileSketch()
+        sketch.update(latency / 24)
+        return percentile_table({'Days to Refund': sketch})
+
     def refund_size_distribution(self) -> pd.DataFrame:
         """Distribution of refunds by amount ranges."""
         if self.df.empty:
@@ -247,9 +434,9 @@ class Generator:
         bins = [0, 50, 100, 500, 1000, 5000, float('inf')]
         labels = ['₹0-50', '₹51-100', '₹101-500', '₹501-1000', '₹1001-5000', '₹5000+']
 
-        self.df['Amount Range'] = pd.cut(self.df['Refund Amount'], bins=bins, labels=labels, right=True)
+        amount_range = pd.cut(self.df['Refund Amount'], bins=bins, labels=labels, right=True)
 
-        result = self.df['Amount Range'].value_counts().reset_index()
+        result = amount_range.value_counts().reset_index()
         result.columns = ['Amount Range', 'Count']
 
         total_count = result['Count'].sum()
@@ -1,22 +1,51 @@
 import pandas as pd
+from typing import List, Union
+
+from datasets import categorize, enable_copy_on_write, iter_prepared_frames, load_prepared
+from sketches import percentile_table, quantile_sketch
 
 class Generator:
-    def __init__(self, csv_path: str = None, df: pd.DataFrame = None, report_title = "Report Analysis"):
-        """Initialize with either a CSV path or a DataFrame."""
+    # Columns this analyzer reads from the export, and how to type them
+    SCHEMA = {
+        'usecols': ['Product Name', 'Product Type', 'Quantity', 'Total Sales Volume', 'Net Revenue'],
+        'dtypes': {
+            'Quantity': 'int64', 'Total Sales Volume': 'float64', 'Net Revenue': 'float64', 'Product Type': 'category'
+        },
+        'dates': [],
+        'null': 'NULL',
+        # Rows are per-product totals for the export period, so there is no key to de-duplicate on
+        'key': None
+    }
+
+    def __init__(self, csv_path: Union[str, List[str]] = None, df: pd.DataFrame = None,
+                 report_title = "Report Analysis", sidecar: str = None,
+                 copy: bool = True):
+        """
+        Initialize with either a CSV path (a path, glob pattern or list of exports) or a DataFrame.
+
+        sidecar: 'feather' or 'parquet' to keep the prepared data next to the CSV and reuse it
+        on later runs until the CSV changes.
+        copy: with copy=False the Generator wraps df without copying it. Copy-on-write is turned
+        on, so the caller's frame is left unchanged when columns are re-typed or added.
+        """
         if df is not None:
-            self.df = df.copy()
+            if not copy:
+                enable_copy_on_write()
+            self.df = df.copy(deep=copy)
+            # Clean and prepare data
+            self._prepare_data()
         elif csv_path:
-            self.df = pd.read_csv(csv_path)
+            load_prepared(self, csv_path, sidecar=sidecar)
         else:
             raise ValueError("Either csv_path or df must be provided")
 
         self.report_title = report_title
 
-        # Clean and prepare data
-        self._prepare_data()
-
     def _prepare_data(self):
         """Clean and prepare the sales dataset for analysis."""
+        # Store low-cardinality text columns as categoricals
+        categorize(self.df, self.SCHEMA)
+
         # Ensure numeric columns are properly formatted
         numeric_columns = ['Quantity', 'Total Sales Volume', 'Net Revenue']
         for col in numeric_columns:
@@ -40,7 +69,7 @@ class Generator:
 
     def revenue_breakdown_by_product_type(self) -> pd.DataFrame:
         """Analyzes total revenue and sales volume grouped by product type."""
-        result = self.df.groupby('Product Type').agg({
+        result = self.df.groupby('Product Type', observed=True).agg({
             'Quantity': 'sum',
             'Total Sales Volume': 'sum',
             'Net Revenue': 'sum'
@@ -84,6 +113,11 @@ class Generator:
         })
         return result
 
+    def quantity_percentiles(self) -> pd.DataFrame:
+        """P50, P90 and P99 units sold per product from a quantile sketch built chunk by chunk (within 1%)."""
+        sketch = quantile_sketch(iter_prepared_frames(self), 'Quantity')
+        return percentile_table({'Units Sold': sketch})
+
     def financial_summary_overview(self) -> pd.DataFrame:
         """Provides overall financial performance summary across all products."""
         total_sales_volume = self.df['Total Sales Volume'].sum()
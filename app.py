@@ -1,27 +1,321 @@
+import os
+import sys
+import time
 import yaml
+import hashlib
+import argparse
 import importlib
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Union
 
+import utils
+import datasets
+import sketches
 from utils import run_all_analyses
+from datasets import resolve_csv_paths
 
 CONFIG_PATH = "config.yaml"
 
+# Modules every analyzer builds on; a change to any of them can change every report
+SHARED_MODULES = (utils, datasets, sketches)
+
 def load_config(path: str) -> Dict:
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
-def run_report(module_name: str, csv_path: str, title: str, output: str):
+def fingerprint_path(output: str) -> str:
+    return f"{output}.fingerprint"
+
+def csv_options(options: Dict = None) -> List[Union[str, List[str]]]:
+    """Values of the options named `*_csv`, which point at further exports a report reads."""
+    return [value for key, value in sorted((options or {}).items()) if key.endswith("_csv")]
+
+def report_fingerprint(mod, csv_path: Union[str, List[str]], title: str, options: Dict = None) -> str:
+    """
+    Hashes everything a report depends on: input CSV, the source of the analyzer and of the shared
+    modules it runs on (renderer, dataset loading, sketches), title and options.
+    Options named `*_csv` point at further exports the report reads, so those files are hashed too.
+    """
+    digest = hashlib.sha256()
+    extra_csvs = [path for value in csv_options(options) for path in resolve_csv_paths(value)]
+    for path in resolve_csv_paths(csv_path) + extra_csvs + [mod.__file__] + [shared.__file__ for shared in SHARED_MODULES]:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    digest.update(title.encode("utf-8"))
+    digest.update(yaml.safe_dump(options or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+def is_up_to_date(output: str, fingerprint: str) -> bool:
+    if not os.path.exists(output):
+        return False
+    try:
+        with open(fingerprint_path(output), "r") as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+def run_report(module_name: str, csv_path: Union[str, List[str]], title: str, output: str, executor: str = None,
+               force: bool = False, options: Dict = None) -> Optional[str]:
+    """Generates one report. Returns its path, or None when the cached report is still current."""
+    mod = importlib.import_module(f"analyzers.{module_name}")
+
+    fingerprint = report_fingerprint(mod, csv_path, title, options)
+    if not force and is_up_to_date(output, fingerprint):
+        print(f"{module_name} analysis unchanged. Skipped: {output}")
+        return None
+
+    gen = build_generator(module_name, csv_path, title, options)
+    report_path = save_report(gen, output, fingerprint, executor=executor)
+    print(f"{module_name} analysis complete. Saved to: {report_path}")
+    return report_path
+
+def build_generator(module_name: str, csv_path: Union[str, List[str]], title: str, options: Dict = None):
     mod = importlib.import_module(f"analyzers.{module_name}")
     # convention: each module exposes Generator class
     gen_class = getattr(mod, "Generator")
-    gen = gen_class(csv_path=csv_path, report_title=title)
-    report_path = run_all_analyses(gen, output)
-    print(f"{module_name} analysis complete. Saved to: {report_path}")
+    # `options` in config.yaml are passed straight through as extra constructor arguments
+    return gen_class(csv_path=csv_path, report_title=title, **(options or {}))
+
+def save_report(gen, output: str, fingerprint: str, executor: str = None) -> str:
+    report_path = run_all_analyses(gen, output, executor=executor)
+
+    # Only record the fingerprint once the report has been fully written
+    with open(fingerprint_path(output), "w") as f:
+        f.write(fingerprint)
+
+    return report_path
+
+def run_job(key: str, spec: Dict, executor: str = None, force: bool = False) -> Tuple[str, float, str, Optional[str]]:
+    """Runs one configured report, returning (key, elapsed seconds, status, error or None)."""
+    start = time.perf_counter()
+    error = None
+    try:
+        report_path = run_report(spec["module"], spec["csv"], spec.get("title", key), spec["output"],
+                                 executor=executor or spec.get("executor"), force=force,
+                                 options=spec.get("options"))
+        status = "ok" if report_path else "cached"
+    except Exception as e:
+        # Report the failure but let the remaining reports run
+        error = f"{type(e).__name__}: {e}"
+        status = f"FAILED ({error})"
+        print(f"{key} analysis failed: {error}")
+    return key, time.perf_counter() - start, status, error
+
+def run_jobs(jobs: List[Tuple[str, Dict]], executor: str = None, force: bool = False) -> List[Tuple[str, float, str, Optional[str]]]:
+    """Runs several reports one after another in this process, so they share parsed exports."""
+    return [run_job(key, spec, executor, force) for key, spec in jobs]
+
+def set_memory_budget(budget_mb: float):
+    """Sets how much memory parsed exports no report is using may keep in this process's registry."""
+    datasets.registry.budget_mb = budget_mb
+
+def file_signature(csv_path: Union[str, List[str]]) -> Optional[Tuple]:
+    """
+    Cheap change marker for a report's input: (path, size, mtime in ns) of every matching file,
+    or None if there are none. Globs are re-expanded, so a newly added export counts as a change.
+    """
+    try:
+        stats = [(path, os.stat(path)) for path in resolve_csv_paths(csv_path)]
+    except OSError:
+        return None
+    return tuple((path, stat.st_size, stat.st_mtime_ns) for path, stat in stats)
+
+def report_signature(spec: Dict) -> Optional[Tuple]:
+    """file_signature of a report's CSV and of every `*_csv` option's files, or None if any is missing."""
+    signatures = [file_signature(csv_path) for csv_path in [spec["csv"]] + csv_options(spec.get("options"))]
+    return None if any(signature is None for signature in signatures) else tuple(signatures)
+
+def watch(reports: Dict[str, Dict], interval: float, executor: str = None, force: bool = False):
+    """
+    Polls the configured CSVs (including `*_csv` options) and re-renders only the reports whose input changed.
+
+    Reports whose cached output is still current are not rebuilt on startup. Parsed exports stay
+    in the dataset registry between renders (up to the memory budget), so a refresh only pays for
+    parsing the changed export. A change is picked up once the file has stopped changing for one
+    polling interval, so exports that are still being written are not read half-way.
+    """
+    rendered = {}   # key -> file signature the current report was built from
+    polled = {}     # key -> file signature seen on the previous poll
+
+    print(f"Watching {len(reports)} report(s) every {interval}s. Press Ctrl+C to stop.")
+    try:
+        while True:
+            for key, spec in reports.items():
+                signature = report_signature(spec)
+                first_load = key not in rendered
+                settled = first_load or signature == polled.get(key)
+                polled[key] = signature
+                if signature is None or signature == rendered.get(key) or not settled:
+                    continue
+
+                # Remember the signature even on failure so a broken export is retried only after it changes
+                rendered[key] = signature
+                title = spec.get("title", key)
+                try:
+                    mod = importlib.import_module(f"analyzers.{spec['module']}")
+                    fingerprint = report_fingerprint(mod, spec["csv"], title, spec.get("options"))
+                    if not force and first_load and is_up_to_date(spec["output"], fingerprint):
+                        print(f"{key} analysis unchanged. Skipped: {spec['output']}")
+                        continue
+
+                    gen = build_generator(spec["module"], spec["csv"], title, spec.get("options"))
+                    report_path = save_report(gen, spec["output"], fingerprint,
+                                              executor=executor or spec.get("executor"))
+                    print(f"{key} analysis complete. Saved to: {report_path}")
+                except Exception as e:
+                    print(f"{key} analysis failed: {type(e).__name__}: {e}")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def order_jobs(reports: Dict[str, Dict]) -> List[Tuple[str, Dict]]:
+    """Orders report jobs largest input CSV first, so long jobs start early."""
+    def csv_size(item):
+        try:
+            return sum(os.path.getsize(path) for path in resolve_csv_paths(item[1]["csv"]))
+        except OSError:
+            return 0
+
+    return sorted(reports.items(), key=csv_size, reverse=True)
+
+def generator_class(spec: Dict):
+    """The job's Generator class, or None if its module cannot be imported (run_job reports that)."""
+    try:
+        return getattr(importlib.import_module(f"analyzers.{spec['module']}"), "Generator")
+    except Exception:
+        return None
+
+def loads_export(spec: Dict) -> bool:
+    """Whether the job parses its CSV whole through the dataset registry, rather than streaming it."""
+    gen_class = generator_class(spec)
+    if gen_class is None or (spec.get("options") or {}).get("chunksize"):
+        return False
+    return not getattr(gen_class, "STREAMS_EXPORTS", False)
+
+def job_reads(spec: Dict) -> List[Tuple[str, Dict]]:
+    """
+    (absolute path, schema) of every file the job reads: its CSV with the Generator's SCHEMA, then
+    each `<name>_csv` option with the Generator's `<NAME>_SCHEMA`, if it has one.
+    """
+    gen_class = generator_class(spec)
+    values = [(spec["csv"], getattr(gen_class, "SCHEMA", None))]
+    for name, value in sorted((spec.get("options") or {}).items()):
+        if name.endswith("_csv"):
+            values.append((value, getattr(gen_class, f"{name[:-len('_csv')].upper()}_SCHEMA", None)))
+
+    reads = []
+    for value, schema in values:
+        if schema is None:
+            continue
+        try:
+            reads.extend((os.path.abspath(path), schema) for path in resolve_csv_paths(value))
+        except OSError:
+            pass
+    return reads
+
+def registry_key(path: str, schema: Dict) -> Tuple:
+    """What the dataset registry keys a file's parse by, besides the file's size and mtime."""
+    return path, schema.get("null", "NULL"), schema.get("key")
+
+def group_jobs(jobs: List[Tuple[str, Dict]]) -> List[List[Tuple[str, Dict]]]:
+    """
+    Groups jobs that share a parse, so each group runs in one worker process. A job joins a group
+    only if jobs there load a file it reads with every column it needs, so that read is served
+    from the dataset registry instead of parsing the file again. A job that could join several
+    groups joins the one saving it the most bytes of parsing rather than merging them, so sharing
+    never chains otherwise unrelated reports into one serial worker. Loaders are placed (and run)
+    first, so the streaming jobs find the exports cached.
+    """
+    groups = []   # [jobs, registry_key -> columns the group's loaders cache]
+    # Stable sort: loaders keep job order (largest export first) ahead of the streaming jobs
+    for key, spec in sorted(jobs, key=lambda job: not loads_export(job[1])):
+        reads = job_reads(spec)
+
+        best, saved = None, 0
+        for group in groups:
+            shared = sum(os.path.getsize(path) for path, schema in reads
+                         if set(schema["usecols"]) <= group[1].get(registry_key(path, schema), set()))
+            if shared > saved:
+                best, saved = group, shared
+        if best is None:
+            best = [[], {}]
+            groups.append(best)
+        best[0].append((key, spec))
+
+        if loads_export(spec):
+            try:
+                own = reads[:len(resolve_csv_paths(spec["csv"]))]
+            except OSError:
+                own = []
+            for path, schema in own:
+                best[1].setdefault(registry_key(path, schema), set()).update(schema["usecols"])
+    return [group[0] for group in groups]
+
+def print_summary(results: List[Tuple[str, float, str, Optional[str]]], wall_time: float):
+    print("\nSummary:")
+    for key, elapsed, status, _ in results:
+        print(f"  {key:<24} {elapsed:8.2f}s  {status}")
+
+    failed = sum(1 for *_, error in results if error is not None)
+    cached = sum(1 for _, _, status, _ in results if status == "cached")
+    print(f"{len(results) - failed} succeeded ({cached} unchanged), {failed} failed in {wall_time:.2f}s")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate insight reports from DodoPayments exports.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path to the config file.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of reports to run in parallel processes (0 = one per CPU). "
+                             "Overrides `workers` in the config file.")
+    parser.add_argument("--executor", choices=["thread", "process"], default=None,
+                        help="Run the analyses inside each report concurrently using threads or forked processes. "
+                             "Overrides `executor` on the individual reports.")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate every report even if its inputs have not changed.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-render a report whenever its CSV changes.")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Seconds between file checks in watch mode. Overrides `watch_interval` in the config file.")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    cfg = load_config(args.config)
+
+    workers = args.workers if args.workers is not None else cfg.get("workers", 1)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    budget_mb = cfg.get("dataset_memory_budget_mb", datasets.DEFAULT_MEMORY_BUDGET_MB)
+    set_memory_budget(budget_mb)
+
+    if args.watch:
+        interval = args.interval if args.interval is not None else cfg.get("watch_interval", 5)
+        watch(cfg.get("reports", {}), interval, executor=args.executor, force=args.force)
+        return 0
+
+    jobs = order_jobs(cfg.get("reports", {}))
+    start = time.perf_counter()
+
+    # Reports reading the same export run in the same worker, where they share the parsed data
+    groups = group_jobs(jobs)
+    if workers > 1 and len(groups) > 1:
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups)),
+                                 initializer=set_memory_budget, initargs=(budget_mb,)) as pool:
+            futures = [pool.submit(run_jobs, group, args.executor, args.force) for group in groups]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    else:
+        results = run_jobs([job for group in groups for job in group], args.executor, args.force)
+    # Keep the summary in job order regardless of completion order
+    order = {key: i for i, (key, _) in enumerate(jobs)}
+    results.sort(key=lambda r: order[r[0]])
 
-def main():
-    cfg = load_config(CONFIG_PATH)
-    for key, spec in cfg.get("reports", {}).items():
-        run_report(spec["module"], spec["csv"], spec.get("title", key), spec["output"])
+    print_summary(results, time.perf_counter() - start)
+    return 1 if any(error is not None for *_, error in results) else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Memory and groupby time of low-cardinality payment columns stored as strings vs categoricals.
+
+    python benchmarks/categoricals.py --rows 10000000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from benchmarks.synthetic import payments_frame
+
+COLUMNS = ['Payment Status', 'Payment Method', 'Payment Method Type', 'Currency',
+           'Settlement Currency', 'Billing Country']
+
+def timed(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def groupbys(df: pd.DataFrame):
+    """The groupby shapes the payments analyses run."""
+    df.groupby('Payment Status', observed=True).agg(
+        ids=('Payment ID', 'count'), amount=('Amount', 'sum'), fee=('Payment Fee', 'sum'))
+    df.groupby('Payment Method', observed=True).agg(amount=('Amount', 'sum'), fee=('Payment Fee', 'mean'))
+    df.groupby('Settlement Currency', observed=True)['Amount'].sum()
+    df.groupby(['Billing Country', 'Currency'], observed=True)['Amount'].sum()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} synthetic payment rows ...")
+    strings = payments_frame(args.rows)
+    strings['Payment Method Type'] = strings['Payment Method Type'].replace('NULL', None)
+    categoricals = strings.copy()
+    for col in COLUMNS:
+        categoricals[col] = categoricals[col].astype('category')
+
+    string_mb = strings[COLUMNS].memory_usage(deep=True).sum() / 1024 ** 2
+    category_mb = categoricals[COLUMNS].memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{'':<14} {'Memory (MB)':>12} {'Groupby (s)':>12}")
+    print(f"{'strings':<14} {string_mb:>12,.1f} {timed(lambda: groupbys(strings)):>12.3f}")
+    print(f"{'categoricals':<14} {category_mb:>12,.1f} {timed(lambda: groupbys(categoricals)):>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Parse time and peak RSS of the payments loader, before and after the typed schema loader.
+
+    python benchmarks/csv_loader.py --size-mb 2048
+
+Each variant runs in a fresh process so peak RSS is measured independently.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.synthetic import write_payments_csv
+
+def load_untyped(csv_path: str):
+    """What payments.Generator did before: parse everything, then re-type in _prepare_data."""
+    import pandas as pd
+    df = pd.read_csv(csv_path)
+    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0)
+    df['Created At'] = pd.to_datetime(df['Created At'], errors='coerce')
+    return df
+
+def load_typed(csv_path: str):
+    from datasets import read_csv_typed
+    from analyzers.payments import Generator
+    return read_csv_typed(csv_path, Generator.SCHEMA)
+
+def _measure(loader, csv_path, queue):
+    start = time.perf_counter()
+    df = loader(csv_path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, len(df)))
+
+def measure(loader, csv_path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(loader, csv_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048, help="Size of the synthetic payments export.")
+    parser.add_argument("--csv", default="/tmp/bench-payments.csv", help="Where to write the synthetic export.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv) or os.path.getsize(args.csv) < args.size_mb * 1024 * 1024:
+        print(f"Writing ~{args.size_mb} MB synthetic payments export to {args.csv} ...")
+        write_payments_csv(args.csv, target_bytes=args.size_mb * 1024 * 1024)
+
+    print(f"{'Loader':<10} {'Rows':>12} {'Parse (s)':>10} {'Peak RSS (MB)':>14}")
+    for name, loader in (("untyped", load_untyped), ("typed", load_typed)):
+        elapsed, peak_mb, rows = measure(loader, args.csv)
+        print(f"{name:<10} {rows:>12,} {elapsed:>10.2f} {peak_mb:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Time of the customer ratios and segment analyses with the old row-wise apply/lambda path vs
+vectorized zero-safe division and the shared pd.cut segments.
+
+    python benchmarks/customer_segments.py --rows 100000 1000000
+
+Both paths run on the same frame and their outputs are checked to be identical.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from analyzers.customer import Generator
+from benchmarks.synthetic import customers_frame
+
+def row_wise_ratios(df: pd.DataFrame) -> pd.DataFrame:
+    """What _prepare_data did before: one Python call per customer and ratio."""
+    return pd.DataFrame({
+        'Average Order Value': df.apply(
+            lambda x: x['Success Orders Amount'] / x['Success Orders Count'] if x['Success Orders Count'] > 0 else 0,
+            axis=1),
+        'Refund Rate': df.apply(
+            lambda x: (x['Total Refunds Amount'] / x['Success Orders Amount'] * 100) if x['Success Orders Amount'] > 0 else 0,
+            axis=1),
+        'Dispute Rate': df.apply(
+            lambda x: (x['Total Disputes Amount'] / x['Success Orders Amount'] * 100) if x['Success Orders Amount'] > 0 else 0,
+            axis=1)
+    })
+
+def row_wise_loyalty(df: pd.DataFrame) -> pd.Series:
+    def categorize_loyalty(order_count):
+        if order_count == 0:
+            return 'Inactive'
+        elif order_count == 1:
+            return 'One-time'
+        elif 2 <= order_count <= 5:
+            return 'Occasional (2-5)'
+        elif 6 <= order_count <= 10:
+            return 'Regular (6-10)'
+        else:
+            return 'Loyal (>10)'
+    return df['Success Orders Count'].apply(categorize_loyalty)
+
+def row_wise_risk(df: pd.DataFrame) -> pd.Series:
+    def categorize_risk(risk_score):
+        if risk_score == 0:
+            return 'No Risk'
+        elif risk_score <= 5:
+            return 'Low Risk (≤5%)'
+        elif risk_score <= 15:
+            return 'Medium Risk (5-15%)'
+        else:
+            return 'High Risk (>15%)'
+    return (df['Refund Rate'] + df['Dispute Rate']).apply(categorize_risk)
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12} {'Step':<10} {'Row-wise (s)':>13} {'Vectorized (s)':>15} {'Speedup':>8}")
+    for rows in args.rows:
+        gen = Generator(df=customers_frame(rows), copy=False)
+        df = gen.df
+        columns = ['Average Order Value', 'Refund Rate', 'Dispute Rate']
+
+        steps = {
+            'ratios': (lambda: row_wise_ratios(df), lambda: pd.DataFrame({
+                'Average Order Value': gen._safe_divide(df['Success Orders Amount'], df['Success Orders Count']),
+                'Refund Rate': gen._safe_divide(df['Total Refunds Amount'], df['Success Orders Amount']) * 100,
+                'Dispute Rate': gen._safe_divide(df['Total Disputes Amount'], df['Success Orders Amount']) * 100
+            })),
+            'loyalty': (lambda: row_wise_loyalty(df),
+                        lambda: gen._segment('loyalty', df['Success Orders Count'], 'Loyalty Segment')),
+            'risk': (lambda: row_wise_risk(df),
+                     lambda: gen._segment('risk', df['Refund Rate'] + df['Dispute Rate'], 'Risk Level')),
+        }
+        for name, (row_wise, vectorized) in steps.items():
+            old, old_time = timed(row_wise)
+            new, new_time = timed(vectorized)
+            if name == 'ratios':
+                pd.testing.assert_frame_equal(old, new[columns], check_dtype=False)
+            else:
+                pd.testing.assert_series_equal(old, new.astype(str), check_dtype=False, check_names=False)
+            print(f"{rows:>12,} {name:<10} {old_time:>13.3f} {new_time:>15.4f} {old_time / new_time:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
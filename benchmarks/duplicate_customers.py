@@ -0,0 +1,73 @@
+"""
+Time of duplicate_customer_clusters as the customer export grows, to check it scales linearly.
+
+    python benchmarks/duplicate_customers.py --rows 1000000 2000000 4000000
+
+Each synthetic export has --aliases (default 2%) of its customers re-registered under another
+customer's Gmail address with dots and a '+tag' added, or under the same name in different
+case and spacing with the same mailbox name at another provider, so every alias should end up in
+a cluster with its original. With --names the customers share that many common names, which on
+their own must not make anyone a duplicate.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+from analyzers.customer import Generator
+from benchmarks.synthetic import customers_frame
+
+def with_aliases(rows: int, share: float, common_names: int = None, seed: int = 0) -> pd.DataFrame:
+    df = customers_frame(rows, seed=seed)
+    df['Customer Email'] = df['Customer Email'].str.replace('@example.com', '@gmail.com', regex=False)
+
+    rng = np.random.default_rng(seed)
+    if common_names:
+        df['Customer Name'] = np.char.add("Customer ", rng.integers(0, common_names, rows).astype(str))
+
+    aliases = rng.choice(rows, size=2 * int(rows * share), replace=False)
+    originals, copies = aliases[::2], aliases[1::2]
+    by_email, by_name = np.array_split(np.arange(len(copies)), 2)
+
+    emails = df['Customer Email'].to_numpy(dtype=object)
+    names = df['Customer Name'].to_numpy(dtype=object)
+    emails[copies[by_email]] = (pd.Series(emails[originals[by_email]])
+                                .str.replace('customer', 'cus.tomer', regex=False)
+                                .str.replace('@', '+shop@', regex=False).to_numpy())
+    names[copies[by_name]] = pd.Series(names[originals[by_name]]).str.upper().str.replace(' ', '  ').to_numpy()
+    emails[copies[by_name]] = pd.Series(emails[originals[by_name]]).str.replace('@gmail.com', '@yahoo.com', regex=False).to_numpy()
+    df['Customer Email'] = emails
+    df['Customer Name'] = names
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 2_000_000, 4_000_000])
+    parser.add_argument("--aliases", type=float, default=0.02)
+    parser.add_argument("--names", type=int, default=None, help="Draw customer names from this many common names.")
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12} {'Prepare (s)':>12} {'Clusters (s)':>13} {'us/row':>7} {'Clusters':>9} {'Accounts':>9}")
+    for rows in args.rows:
+        df = with_aliases(rows, args.aliases, args.names)
+
+        start = time.perf_counter()
+        gen = Generator(df=df, copy=False)
+        prepare_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gen.duplicate_customer_clusters()
+        cluster_time = time.perf_counter() - start
+
+        members = gen._duplicate_clusters()
+        assert len(members) == 2 * int(rows * args.aliases)
+        print(f"{rows:>12,} {prepare_time:>12.2f} {cluster_time:>13.2f} {cluster_time / rows * 1e6:>7.2f} "
+              f"{members['cluster'].nunique():>9,} {len(members):>9,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Exact vs approximate (Space-Saving sketch) top customers by amount on a synthetic payments stream.
+
+    python benchmarks/heavy_hitters.py --rows 4000000 --customers 1000000 --capacity 100 1000
+
+Both modes read the same pre-generated chunks. State is how many totals each mode holds at the
+end: exact keeps one for every customer it has seen, the sketch at most --capacity. Recall is how
+many of the exact top --top the sketch lists, and the largest error bound shows how far any listed
+total may be too high.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import payments_frame
+from sketches import heavy_hitters
+
+def chunks(rows: int, customers: int, chunk_rows: int) -> list:
+    frames = []
+    for start in range(0, rows, chunk_rows):
+        df = payments_frame(min(chunk_rows, rows - start), customers=customers, start=start)
+        # Skew the spend so a few customers stand out, as they do in real exports
+        df['Amount'] = df['Amount'] / (df['Customer ID'].str[-6:].astype(int) % 1000 + 1)
+        frames.append(df[['Customer Email', 'Amount']])
+    return frames
+
+def exact_totals(frames) -> pd.Series:
+    totals = None
+    for frame in frames:
+        part = frame.groupby('Customer Email')['Amount'].sum()
+        totals = part if totals is None else totals.add(part, fill_value=0)
+    return totals
+
+def measure(run):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=4_000_000)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    frames = chunks(args.rows, args.customers, args.chunk_rows)
+
+    totals, elapsed = measure(lambda: exact_totals(frames))
+    exact = totals.nlargest(args.top)
+    print(f"{'Mode':>16} {'Time (s)':>9} {'State':>10} {'Recall':>7} {'Max error':>10}")
+    print(f"{'exact':>16} {elapsed:>9.2f} {len(totals):>10,} {args.top:>4}/{args.top:<2} {0:>10.2f}")
+
+    for capacity in args.capacity:
+        sketch, elapsed = measure(lambda: heavy_hitters(frames, ['Customer Email'], weight='Amount', capacity=capacity))
+        top = sketch.top(args.top)
+        recall = int(np.isin(top.index, exact.index).sum())
+        print(f"{f'approx ({capacity})':>16} {elapsed:>9.2f} {len(sketch.counters):>10,} {recall:>4}/{args.top:<2} "
+              f"{top['error'].max():>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Peak memory of building each Generator from an in-memory DataFrame and running every analysis,
+with the default deep copy vs copy=False.
+
+    python benchmarks/memory.py --repeat 500
+
+The sample exports in reports/ are tiled `--repeat` times (with unique row keys) to get a frame
+large enough to measure. Peak is the most memory traced by tracemalloc above the input frame,
+reported as a multiple of the input frame's size. The script exits non-zero if any analyzer's
+copy=False peak goes over its MAX_RATIO (or --max-ratio for all of them), so it guards against
+regressions; tests/test_memory.py runs the same check.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import importlib
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from datasets import read_csv_typed
+from utils import run_all_analyses
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+ANALYZERS = {
+    'account_summary': 'reports/account-summary-report.csv',
+    'customer': 'reports/customer-report.csv',
+    'payments': 'reports/payments-report.csv',
+    'refunds': 'reports/refunds-report.csv',
+    'sales': 'reports/sales-report.csv',
+}
+
+# Largest copy=False peak allowed per analyzer, as a multiple of the input frame. Measured ratios
+# from --repeat 200 up, with about 1.5x headroom: account_summary 3.6, customer 2.8, payments 1.4,
+# refunds 3.4, sales 24. Sales renders per-product tables, so its report (and the markdown built
+# for it) grows with the input. Smaller tiles are dominated by fixed overhead and go higher.
+MAX_RATIO = {
+    'account_summary': 5.5,
+    'customer': 4.0,
+    'payments': 2.0,
+    'refunds': 5.0,
+    'sales': 35.0,
+}
+
+def tiled_frame(gen_class, csv_path: str, repeat: int) -> pd.DataFrame:
+    """The raw export repeated `repeat` times, as a pipeline would hand it to the Generator."""
+    df = read_csv_typed(csv_path, gen_class.SCHEMA)
+    df = pd.concat([df] * repeat, ignore_index=True)
+
+    # Keep natural keys unique so per-row analyses do not collapse the copies
+    key = gen_class.SCHEMA.get('key')
+    if key and key in df.columns:
+        df[key] = df[key].astype(str) + '_' + (df.index // (len(df) // repeat)).astype(str)
+    return df
+
+def peak_mb(gen_class, df: pd.DataFrame, copy: bool) -> float:
+    """Peak MB traced while constructing the Generator and rendering its report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        gen = gen_class(df=df, report_title="Memory benchmark", copy=copy)
+        run_all_analyses(gen, os.path.join(tmp, "report.md"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+def input_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500, help="How many times to tile each sample export.")
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="Fail if a copy=False peak exceeds this multiple of the input frame's size, "
+                             "instead of each analyzer's MAX_RATIO.")
+    args = parser.parse_args()
+
+    print(f"{'Analyzer':<16} {'Rows':>10} {'Input (MB)':>11} {'copy=True':>10} {'copy=False':>11} {'Ratio':>6}")
+    failures = []
+    for name, csv_path in ANALYZERS.items():
+        gen_class = importlib.import_module(f"analyzers.{name}").Generator
+        df = tiled_frame(gen_class, os.path.join(ROOT, csv_path), args.repeat)
+        size = input_mb(df)
+
+        copied = peak_mb(gen_class, df, copy=True)
+        shared = peak_mb(gen_class, df, copy=False)
+        ratio = shared / size
+        print(f"{name:<16} {len(df):>10,} {size:>11,.1f} {copied:>10,.1f} {shared:>11,.1f} {ratio:>6.2f}")
+
+        limit = args.max_ratio if args.max_ratio is not None else MAX_RATIO[name]
+        if ratio > limit:
+            failures.append(f"{name} ({ratio:.2f}x > {limit}x)")
+
+    if failures:
+        print(f"Peak memory above the limit for: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Exact percentiles vs a mergeable quantile sketch on a synthetic payments amount column.
+
+    python benchmarks/quantiles.py --rows 1000000 4000000 --accuracy 0.01 0.001
+
+Exact needs the whole column in memory at once (Series.quantile); the sketch is built chunk by
+chunk, with one sketch per chunk merged into the total as the account-summary partials are, and
+only keeps its buckets. Error is the largest relative difference from the exact P50, P90, P99 and
+P99.9.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from benchmarks.synthetic import payments_columns
+from sketches import QuantileSketch
+
+QUANTILES = [0.5, 0.9, 0.99, 0.999]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 4_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--accuracy", type=float, nargs="+", default=[0.01, 0.001])
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12} {'Mode':>16} {'Time (s)':>9} {'Buckets':>8} {'Error':>8}")
+    for rows in args.rows:
+        amount = payments_columns(rows, ['Amount'])['Amount']
+
+        start = time.perf_counter()
+        exact = amount.quantile(QUANTILES).to_numpy()
+        print(f"{rows:>12,} {'exact':>16} {time.perf_counter() - start:>9.2f} {'-':>8} {0:>8.2%}")
+
+        for accuracy in args.accuracy:
+            start = time.perf_counter()
+            sketch = QuantileSketch(accuracy)
+            for offset in range(0, rows, args.chunk_rows):
+                part = QuantileSketch(accuracy)
+                part.update(amount.iloc[offset:offset + args.chunk_rows])
+                sketch.merge(part)
+            approx = sketch.quantiles(QUANTILES)
+            elapsed = time.perf_counter() - start
+
+            error = np.max(np.abs(approx - exact) / np.abs(exact))
+            print(f"{rows:>12,} {f'sketch ({accuracy})':>16} {elapsed:>9.2f} {len(sketch.buckets):>8,} {error:>8.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Time and peak memory of reconciling a synthetic ledger against its payments export.
+
+    python benchmarks/reconciliation.py --rows 5000000 --partitions 8
+
+The ledger has three entries (payment, tax, fee) per successful payment. Peak memory is the
+process's maximum resident set size, so it includes the interpreter and pandas themselves. The
+synthetic exports agree with each other, so every issue count is checked to be zero.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analyzers.reconciliation import Generator
+from benchmarks.synthetic import write_ledger_csvs
+
+ISSUES = ['Unmatched Ledger Entries', 'Succeeded Payments without Ledger Credit', 'Amount Mismatches']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Synthetic payments to generate.")
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_csv = os.path.join(tmp, "account-summary.csv")
+        payments_csv = os.path.join(tmp, "payments.csv")
+        print(f"Writing {args.rows:,} synthetic payments and their ledger entries ...")
+        ledger_rows = write_ledger_csvs(ledger_csv, payments_csv, args.rows)
+        baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        start = time.perf_counter()
+        gen = Generator(csv_path=ledger_csv, payments_csv=payments_csv, chunksize=args.chunksize,
+                        partitions=args.partitions)
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    summary = gen.reconciliation_summary().set_index('Metric')['Value']
+    print(f"Reconciled {ledger_rows:,} ledger rows in {elapsed:.1f}s "
+          f"({ledger_rows / elapsed:,.0f} rows/s), peak RSS {peak_mb:,.0f} MB "
+          f"(after generating the data: {baseline_mb:,.0f} MB)")
+    print(summary.to_string())
+    assert (summary[ISSUES] == 0).all()
+
+if __name__ == "__main__":
+    main()
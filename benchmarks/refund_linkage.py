@@ -0,0 +1,83 @@
+"""
+Time and peak memory of linking refunds to a synthetic payments export on Payment ID.
+
+    python benchmarks/refund_linkage.py --rows 5000000 --refunds 0.02
+
+--refunds of the successful payments get a refund one to 40 days after the payment. Peak memory
+is the process's maximum resident set size, so it includes the interpreter and pandas themselves.
+The refunded share is checked against the overall refund rate the analysis reports.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+from analyzers.refunds import Generator
+from benchmarks.synthetic import write_payments_csv
+
+def refunds_for(payments_csv: str, share: float, seed: int = 0) -> pd.DataFrame:
+    """A refunds export refunding `share` of the successful payments in payments_csv."""
+    payments = pd.read_csv(payments_csv, usecols=['Payment ID', 'Created At', 'Payment Status', 'Payment Method'],
+                           parse_dates=['Created At'])
+    payments = payments[payments['Payment Status'] == 'succeeded']
+    refunded = payments.sample(frac=share, random_state=seed)
+
+    rng = np.random.default_rng(seed)
+    rows = len(refunded)
+    amount = rng.gamma(2.0, 200.0, rows).round(2)
+    return pd.DataFrame({
+        'Refund ID': [f"ref_{i:021d}" for i in range(rows)],
+        'Payment ID': refunded['Payment ID'].to_numpy(),
+        'Refund Created At': refunded['Created At'].to_numpy() + pd.to_timedelta(rng.uniform(1, 40, rows), unit='D'),
+        'Customer Name': 'Customer',
+        'Customer Email': 'customer@example.com',
+        'Refund Type': 'partial',
+        'Refund Reason': 'requested_by_customer',
+        'Refund Amount': amount,
+        'Refund Currency': 'INR',
+        'Refund Settlement Amount': amount,
+        'Refund Settlement Tax': (amount * 0.18 / 1.18).round(2),
+        'Refund Fee': 0.0,
+        'Refund Status': 'succeeded',
+        'Payment Method': refunded['Payment Method'].to_numpy(),
+        'Payment Method Type': 'NULL',
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Synthetic payments to generate.")
+    parser.add_argument("--refunds", type=float, default=0.02, help="Share of successful payments refunded.")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        payments_csv = os.path.join(tmp, "payments.csv")
+        print(f"Writing {args.rows:,} synthetic payments ...")
+        write_payments_csv(payments_csv, rows=args.rows)
+        refunds = refunds_for(payments_csv, args.refunds)
+        baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        start = time.perf_counter()
+        gen = Generator(df=refunds, copy=False, payments_csv=payments_csv, payments_chunksize=args.chunksize)
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    rates = gen.refund_rate_by_currency()
+    print(f"Linked {len(refunds):,} refunds to {args.rows:,} payments in {elapsed:.1f}s "
+          f"({args.rows / elapsed:,.0f} payments/s), peak RSS {peak_mb:,.0f} MB "
+          f"(after generating the data: {baseline_mb:,.0f} MB)")
+    print(gen.refund_rate_by_payment_method().to_string(index=False))
+    print(gen.refund_latency_percentiles().to_string(index=False))
+
+    assert rates['Refunded Payments'].sum() == len(refunds)
+    assert len(gen._refund_latency()) == len(refunds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Time of the account-summary time series analyses when every run aggregates the whole ledger
+vs when a rollup store already holds all days but the last one.
+
+    python benchmarks/rollup_store.py --rows 3000000
+
+The ledger is built from synthetic payments (three entries per successful payment) and given
+to the Generator as a DataFrame, so parsing is left out, and the time of _prepare_data, which
+still sees every row, is reported separately. Outputs of both runs are checked to be identical.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from analyzers.account_summary import Generator
+from benchmarks.synthetic import ledger_frame, payments_frame
+
+ANALYSES = ['net_revenue_over_time', 'daily_statistics', 'monthly_trend_analysis', 'currency_breakdown',
+            'daily_closing_balance', 'period_summary']
+
+def synthetic_ledger(rows: int, chunk_rows: int = 1_000_000) -> pd.DataFrame:
+    """About `rows` ledger entries, typed as the export is read."""
+    payments = rows // 3 + 1
+    frames = [ledger_frame(payments_frame(min(chunk_rows, payments - start), start=start))
+              for start in range(0, payments, chunk_rows)]
+    ledger = pd.concat(frames, ignore_index=True)
+    ledger['Created At'] = pd.to_datetime(ledger['Created At'])
+    return ledger[Generator.SCHEMA['usecols']]
+
+def timed_run(ledger: pd.DataFrame, store: str = None):
+    start = time.perf_counter()
+    gen = Generator(df=ledger, copy=False, rollup_store=store)
+    results = {name: getattr(gen, name)() for name in ANALYSES}
+    return results, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} synthetic ledger rows ...")
+    ledger = synthetic_ledger(args.rows)
+    last_day = ledger['Created At'].max().normalize()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "rollups.parquet")
+        # Fill the store with every day but the last, as an earlier run would have
+        Generator(df=ledger[ledger['Created At'] < last_day], copy=False, rollup_store=store)
+
+        full, full_time = timed_run(ledger)
+        incremental, incremental_time = timed_run(ledger, store)
+
+    for name in ANALYSES:
+        pd.testing.assert_frame_equal(full[name], incremental[name], check_dtype=False)
+
+    # _prepare_data runs over every row either way, so it is reported on its own
+    start = time.perf_counter()
+    Generator(df=ledger, copy=False)
+    prepare_time = time.perf_counter() - start
+    full_time -= prepare_time
+    incremental_time -= prepare_time
+
+    print(f"_prepare_data: {prepare_time:.3f}s\n")
+    print(f"{'Whole ledger (s)':>17} {'Rollup store (s)':>17} {'Speedup':>8}")
+    print(f"{full_time:>17.3f} {incremental_time:>17.3f} {full_time / incremental_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
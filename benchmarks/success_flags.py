@@ -0,0 +1,89 @@
+"""
+Time of the payments analyses that compute success rates, with the old per-group lambdas vs
+the 'Succeeded' flag column and built-in sum/mean aggregations.
+
+    python benchmarks/success_flags.py --rows 100000 1000000 10000000
+
+Both paths run on the same prepared frame and their outputs are checked to be identical.
+payment_method_analysis reads the payments cube, which is built once per dataset for several
+analyses, so the cube is built (and timed) before the analyses are compared.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from analyzers.payments import Generator
+from benchmarks.synthetic import payments_frame
+from utils import partial_aggregate
+
+def lambda_payment_method_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    result = df.groupby('Payment Method', observed=True).agg({
+        'Payment ID': 'count',
+        'Amount': ['sum', 'mean'],
+        'Payment Fee': ['sum', 'mean'],
+        'Payment Status': lambda x: (x == 'succeeded').sum() / len(x) * 100
+    }).round(2)
+    result.columns = ['Total Transactions', 'Total Amount', 'Average Amount', 'Total Fees', 'Average Fee', 'Success Rate (%)']
+    return result.reset_index()
+
+def lambda_customer_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    result = df.groupby('Customer Email').agg({
+        'Payment ID': 'count',
+        'Amount': ['sum', 'mean'],
+        'Payment Status': lambda x: (x == 'succeeded').sum(),
+        'Payment Fee': 'sum'
+    }).round(2)
+    result.columns = ['Total Transactions', 'Total Amount', 'Average Transaction', 'Successful Payments', 'Total Fees Paid']
+    result = result.reset_index()
+    result['Success Rate (%)'] = (result['Successful Payments'] / result['Total Transactions'] * 100).round(2)
+    return result.sort_values('Total Amount', ascending=False)
+
+def lambda_hourly_transaction_pattern(df: pd.DataFrame) -> pd.DataFrame:
+    hours = df['Created At'].dt.hour.rename('Hour')
+    result = df[['Payment ID', 'Amount', 'Payment Status']].groupby(hours).agg({
+        'Payment ID': 'count',
+        'Amount': 'mean',
+        'Payment Status': lambda x: (x == 'succeeded').sum() / len(x) * 100
+    }).round(2)
+    result.columns = ['Transaction Count', 'Average Amount', 'Success Rate (%)']
+    return result.reset_index().sort_values('Hour')
+
+LAMBDA_PATHS = {
+    'payment_method_analysis': lambda_payment_method_analysis,
+    'customer_analysis': lambda_customer_analysis,
+    'hourly_transaction_pattern': lambda_hourly_transaction_pattern,
+}
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Rows':>12} {'Analysis':<28} {'Lambda (s)':>11} {'Flags (s)':>10} {'Speedup':>8}")
+    for rows in args.rows:
+        raw = payments_frame(rows)[Generator.SCHEMA['usecols']]
+        raw['Created At'] = pd.to_datetime(raw['Created At'])
+        gen = Generator(df=raw, copy=False)
+        del raw
+
+        _, cube_time = timed(lambda: [partial_aggregate(gen, name) for name in gen._PARTIALS])
+        print(f"{rows:>12,} {'(payments cube, once)':<28} {'':>11} {cube_time:>10.3f}")
+
+        for name, lambda_path in LAMBDA_PATHS.items():
+            old, old_time = timed(lambda: lambda_path(gen.df))
+            new, new_time = timed(getattr(gen, name))
+            pd.testing.assert_frame_equal(old, new, check_dtype=False)
+            print(f"{rows:>12,} {name:<28} {old_time:>11.3f} {new_time:>10.3f} {old_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+PAYMENT_COLUMNS = [
+    "Payment ID", "Created At", "Customer ID", "Customer Name", "Customer Email", "Billing Country",
+    "Amount", "Tax", "Currency", "Settlement Amount", "Settlement Tax", "Settlement Currency",
+    "Payment Method", "Payment Method Type", "Payment Status", "Payment Fee",
+    "Net Amount In Wallet After Fees", "Metadata"
+]
+
+def _ids(prefix: str, values: np.ndarray) -> np.ndarray:
+    return np.char.add(prefix, np.char.zfill(values.astype(str), 21))
+
+def payments_frame(rows: int, customers: int = None, seed: int = 0, start: int = 0) -> pd.DataFrame:
+    """Builds a synthetic payments export shaped like the DodoPayments dashboard CSV."""
+    rng = np.random.default_rng(seed + start)
+    customers = customers or max(rows // 20, 1)
+
+    customer = rng.integers(0, customers, rows)
+    amount = rng.gamma(2.0, 900.0, rows).round(2)
+    tax = (amount * 0.18 / 1.18).round(2)
+    status = rng.choice(["succeeded", "failed", "processing"], rows, p=[0.85, 0.13, 0.02])
+    method = rng.choice(["card", "upi", "netbanking", "wallet"], rows, p=[0.55, 0.3, 0.1, 0.05])
+    method_type = np.where(method == "upi", rng.choice(["upi_collect", "upi_intent"], rows), "NULL")
+    created = (np.datetime64("2023-01-01T00:00:00") +
+               np.sort(rng.integers(0, 3 * 365 * 86400, rows)).astype("timedelta64[s]") +
+               rng.integers(0, 1_000_000, rows).astype("timedelta64[us]"))
+    fee = np.where(status == "succeeded", (amount * 0.0423).round(2), 0)
+
+    return pd.DataFrame({
+        "Payment ID": _ids("pay_", np.arange(start, start + rows)),
+        "Created At": pd.to_datetime(created).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "Customer ID": _ids("cus_", customer),
+        "Customer Name": np.char.add("Customer ", customer.astype(str)),
+        "Customer Email": np.char.add(np.char.add("customer", customer.astype(str)), "@example.com"),
+        "Billing Country": rng.choice(["IN", "US", "GB", "DE"], rows, p=[0.7, 0.15, 0.1, 0.05]),
+        "Amount": amount,
+        "Tax": tax,
+        "Currency": "INR",
+        "Settlement Amount": amount,
+        "Settlement Tax": tax,
+        "Settlement Currency": "INR",
+        "Payment Method": method,
+        "Payment Method Type": method_type,
+        "Payment Status": status,
+        "Payment Fee": fee,
+        "Net Amount In Wallet After Fees": (amount - fee).cumsum().round(2),
+        "Metadata": "{}",
+    }, columns=PAYMENT_COLUMNS)
+
+def write_payments_csv(path: str, target_bytes: int = None, rows: int = None, chunk_rows: int = 500_000) -> int:
+    """Writes a synthetic payments CSV of roughly target_bytes (or exactly `rows` rows). Returns the row count."""
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        while True:
+            if rows is not None and written >= rows:
+                break
+            if target_bytes is not None and f.tell() >= target_bytes:
+                break
+
+            n = chunk_rows if rows is None else min(chunk_rows, rows - written)
+            chunk = payments_frame(n, customers=max((rows or 10_000_000) // 20, 1), start=written)
+            chunk.to_csv(f, index=False, header=written == 0, quoting=2)
+            written += n
+
+    return written
+
+def payments_columns(rows: int, columns: list, chunk_rows: int = 1_000_000) -> pd.DataFrame:
+    """
+    Only the given payments columns, built in chunks to keep peak memory down, with
+    'Created At' parsed and 'Payment Status' stored as a categorical.
+    """
+    frames = []
+    for start in range(0, rows, chunk_rows):
+        chunk = payments_frame(min(chunk_rows, rows - start), customers=max(rows // 20, 1), start=start)[columns]
+        if "Created At" in chunk.columns:
+            chunk["Created At"] = pd.to_datetime(chunk["Created At"])
+        if "Payment Status" in chunk.columns:
+            chunk["Payment Status"] = chunk["Payment Status"].astype("category")
+        frames.append(chunk)
+    return pd.concat(frames, ignore_index=True)
+
+LEDGER_COLUMNS = [
+    "Ledger Entry ID", "Event Type", "Amount", "Currency", "Is Credit", "Reference Object ID",
+    "Created At", "Payout ID"
+]
+
+def ledger_frame(payments: pd.DataFrame) -> pd.DataFrame:
+    """The account-summary ledger entries (payment credit, tax and fee debits) of the successful payments."""
+    succeeded = payments[payments["Payment Status"] == "succeeded"]
+    entries = [
+        ("payment", True, succeeded["Settlement Amount"]),
+        ("tax", False, succeeded["Settlement Tax"]),
+        ("payment_fees", False, succeeded["Payment Fee"]),
+    ]
+    frame = pd.concat([
+        pd.DataFrame({
+            "Event Type": event,
+            "Amount": amount.to_numpy(),
+            "Currency": succeeded["Settlement Currency"].to_numpy(),
+            "Is Credit": is_credit,
+            "Reference Object ID": succeeded["Payment ID"].to_numpy(),
+            "Created At": succeeded["Created At"].to_numpy(),
+            "Payout ID": "NULL",
+        }) for event, is_credit, amount in entries
+    ], ignore_index=True)
+    frame.insert(0, "Ledger Entry ID", np.char.add(frame["Reference Object ID"].to_numpy().astype(str),
+                                                   np.char.add("_", frame["Event Type"].to_numpy().astype(str))))
+    return frame[LEDGER_COLUMNS]
+
+def write_ledger_csvs(ledger_path: str, payments_path: str, rows: int, chunk_rows: int = 500_000) -> int:
+    """Writes `rows` synthetic payments and the ledger entries they produce. Returns the ledger row count."""
+    ledger_rows = 0
+    with open(ledger_path, "w", encoding="utf-8", newline="") as ledger, \
+         open(payments_path, "w", encoding="utf-8", newline="") as payments:
+        for start in range(0, rows, chunk_rows):
+            chunk = payments_frame(min(chunk_rows, rows - start), customers=max(rows // 20, 1), start=start)
+            entries = ledger_frame(chunk)
+            chunk.to_csv(payments, index=False, header=start == 0, quoting=2)
+            entries.to_csv(ledger, index=False, header=start == 0, quoting=2)
+            ledger_rows += len(entries)
+    return ledger_rows
+
+def customers_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a synthetic customer export shaped like the DodoPayments dashboard CSV."""
+    rng = np.random.default_rng(seed)
+    orders = rng.integers(0, 15, rows)
+    amount = np.where(orders > 0, rng.gamma(2.0, 900.0, rows) * orders, 0).round(2)
+    customer = np.arange(rows)
+
+    return pd.DataFrame({
+        "Customer ID": _ids("cus_", customer),
+        "Customer Name": np.char.add("Customer ", customer.astype(str)),
+        "Customer Email": np.char.add(np.char.add("customer", customer.astype(str)), "@example.com"),
+        "Success Orders Count": orders,
+        "Success Orders Amount": amount,
+        "Settlement Currency": "INR",
+        "Total Refunds Count": rng.integers(0, 2, rows),
+        "Total Refunds Amount": (amount * rng.choice([0, 0.03, 0.1, 0.3], rows)).round(2),
+        "Total Disputes Count": rng.integers(0, 2, rows),
+        "Total Disputes Amount": (amount * rng.choice([0, 0, 0.02], rows)).round(2),
+    })
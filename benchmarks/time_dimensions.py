@@ -0,0 +1,81 @@
+"""
+Time of the payments time-based analyses when each derives its own date/hour from 'Created At'
+vs reusing the Date/Hour columns `_prepare_data` adds once.
+
+    python benchmarks/time_dimensions.py --rows 10000000
+
+Outputs of both paths are checked to be identical. The one-time costs of deriving the time
+dimensions and of building the payments cube daily_transaction_volume reads are reported
+separately, since they are paid once per dataset rather than per analysis.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from analyzers.payments import Generator
+from benchmarks.synthetic import payments_columns
+from utils import partial_aggregate
+
+def per_analysis_daily_transaction_volume(df: pd.DataFrame) -> pd.DataFrame:
+    dates = df['Created At'].dt.date.rename('Date')
+    daily_stats = df[['Payment ID', 'Amount']].groupby(dates).agg({'Payment ID': 'count', 'Amount': 'sum'}).reset_index()
+
+    succeeded = df['Payment Status'] == 'succeeded'
+    daily_successful = df.loc[succeeded, 'Amount'].groupby(dates[succeeded]).sum().reset_index()
+    daily_successful.rename(columns={'Amount': 'Successful Amount'}, inplace=True)
+
+    result = pd.merge(daily_stats, daily_successful, on='Date', how='left')
+    result['Successful Amount'] = result['Successful Amount'].fillna(0)
+    result.rename(columns={'Payment ID': 'Transaction Count', 'Amount': 'Total Amount'}, inplace=True)
+    return result.round(2)
+
+def per_analysis_hourly_transaction_pattern(df: pd.DataFrame) -> pd.DataFrame:
+    hours = df['Created At'].dt.hour.rename('Hour')
+    result = df[['Payment ID', 'Amount']].assign(Succeeded=df['Payment Status'] == 'succeeded').groupby(hours).agg({
+        'Payment ID': 'count',
+        'Amount': 'mean',
+        'Succeeded': 'mean'
+    })
+    result.columns = ['Transaction Count', 'Average Amount', 'Success Rate (%)']
+    result['Success Rate (%)'] = result['Success Rate (%)'] * 100
+    return result.round(2).reset_index().sort_values('Hour')
+
+PER_ANALYSIS_PATHS = {
+    'daily_transaction_volume': per_analysis_daily_transaction_volume,
+    'hourly_transaction_pattern': per_analysis_hourly_transaction_pattern,
+}
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} synthetic payment rows ...")
+    gen = Generator(df=payments_columns(args.rows, Generator.SCHEMA['usecols']), copy=False)
+
+    created = gen.df['Created At']
+    _, stage_time = timed(lambda: (created.dt.normalize(), created.dt.hour, created.dt.dayofweek,
+                                   created.dt.to_period('M')))
+    print(f"Deriving Date/Hour/Weekday/Month once: {stage_time:.3f}s")
+    _, cube_time = timed(lambda: [partial_aggregate(gen, name) for name in gen._PARTIALS])
+    print(f"Building the payments cube once: {cube_time:.3f}s\n")
+
+    print(f"{'Analysis':<28} {'Per-analysis (s)':>17} {'Precomputed (s)':>16} {'Speedup':>8}")
+    for name, per_analysis in PER_ANALYSIS_PATHS.items():
+        old, old_time = timed(lambda: per_analysis(gen.df))
+        new, new_time = timed(getattr(gen, name))
+        pd.testing.assert_frame_equal(old, new, check_dtype=False)
+        print(f"{name:<28} {old_time:>17.3f} {new_time:>16.3f} {old_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time of wallet_balance_trend queries: the old full sort of every successful payment, the
+nlargest path used without an index, and slices of the timeline built with wallet_index=True.
+
+    python benchmarks/wallet_timeline.py --rows 20000000
+
+All paths are checked to return the same table.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from analyzers.payments import Generator
+from benchmarks.synthetic import payments_columns
+
+COLUMNS = ['Payment ID', 'Created At', 'Amount', 'Payment Status', 'Net Amount In Wallet After Fees']
+
+def full_sort_wallet_balance_trend(df: pd.DataFrame) -> pd.DataFrame:
+    """What wallet_balance_trend did before: sort every successful payment, then keep the last 10."""
+    rows = df.loc[
+        df['Succeeded'] & df['Net Amount In Wallet After Fees'].notna(),
+        ['Payment ID', 'Created At', 'Net Amount In Wallet After Fees']
+    ].sort_values('Created At')
+    balance = rows['Net Amount In Wallet After Fees']
+    result = rows.assign(**{'Balance Change': balance - balance.shift(1)})
+    result.rename(columns={
+        'Payment ID': 'Transaction',
+        'Created At': 'Date',
+        'Net Amount In Wallet After Fees': 'Wallet Balance'
+    }, inplace=True)
+    result['Wallet Balance'] = result['Wallet Balance'].round(2)
+    result['Balance Change'] = result['Balance Change'].round(2)
+    result['Date'] = result['Date'].dt.strftime('%Y-%m-%d %H:%M')
+    return result.tail(10).reset_index(drop=True)
+
+def timed(func, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} synthetic payment rows ...")
+    df = payments_columns(args.rows, COLUMNS)
+
+    plain = Generator(df=df, copy=False)
+    start = time.perf_counter()
+    indexed = Generator(df=df, copy=False, wallet_index=True)
+    print(f"Construction with wallet_index=True took {time.perf_counter() - start:.2f}s "
+          f"(includes _prepare_data)\n")
+
+    baseline, full_sort_time = timed(lambda: full_sort_wallet_balance_trend(plain.df), repeat=1)
+    print(f"{'Query':<34} {'Time (s)':>10}")
+    print(f"{'latest 10, full sort (before)':<34} {full_sort_time:>10.4f}")
+
+    latest, nlargest_time = timed(plain.wallet_balance_trend)
+    print(f"{'latest 10, nlargest (no index)':<34} {nlargest_time:>10.4f}")
+
+    sliced, index_time = timed(indexed.wallet_balance_trend)
+    print(f"{'latest 10, indexed':<34} {index_time:>10.4f}")
+
+    day = str(indexed.df['Created At'].median().date())
+    ranged, range_time = timed(lambda: indexed.wallet_balance_trend(window=50, start=day, end=day))
+    print(f"{'50 rows on ' + day + ', indexed':<34} {range_time:>10.4f}")
+
+    pd.testing.assert_frame_equal(baseline, latest)
+    pd.testing.assert_frame_equal(baseline, sliced)
+    pd.testing.assert_frame_equal(
+        plain.wallet_balance_trend(window=50, start=day, end=day), ranged
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,559 @@
+import os
+import sys
+import glob
+import pickle
+import weakref
+import hashlib
+import tempfile
+import threading
+import pandas as pd
+from collections import OrderedDict
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from utils import merge_partials, partial_aggregate
+
+# Prefer the multithreaded pyarrow CSV parser when it is installed
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CSV_ENGINE = 'pyarrow' if HAS_PYARROW else 'c'
+
+SIDECAR_FORMATS = ('feather', 'parquet')
+
+# Default for `dataset_memory_budget_mb` in config.yaml
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+def enable_copy_on_write():
+    """
+    Turns on pandas copy-on-write, so a shallow df.copy(deep=False) can be modified without
+    writing through to the frame it came from. Copy-on-write is always on from pandas 3.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+def categorize(df: pd.DataFrame, schema: Dict):
+    """Converts the schema's 'category' columns to categoricals in place (a no-op if they already are)."""
+    for col, dtype in schema.get('dtypes', {}).items():
+        if dtype == 'category' and col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+def as_flags(values: pd.Series) -> pd.Series:
+    """
+    A true/false export column as booleans, whatever read_csv made of it: bool, object with NaN
+    where the export says NULL, or text. Only 'true' (in any case) is True; 'false', missing and
+    anything else are False. (astype(bool) would turn NaN and the text 'false' into True.)
+    """
+    if values.dtype == bool:
+        return values
+    return values.astype('string').str.lower().eq('true').fillna(False).astype(bool)
+
+def resolve_csv_paths(csv_path: Union[str, List[str]]) -> List[str]:
+    """Expands a `csv:` setting (a path, a glob pattern, or a list of either) into file paths."""
+    patterns = [csv_path] if isinstance(csv_path, str) else list(csv_path)
+
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if any(ch in pattern for ch in '*?[') else [pattern]
+        paths.extend(path for path in matches if path not in paths)
+
+    if not paths:
+        raise FileNotFoundError(f"No CSV files match: {csv_path}")
+    return paths
+
+def read_csv_typed(csv_path: Union[str, List[str]], schema: Dict) -> pd.DataFrame:
+    """
+    Reads a DodoPayments export in one pass using an analyzer's column schema.
+
+    The schema is a dict with:
+        usecols: columns the analyzer actually uses; other columns are never parsed
+        dtypes: column -> dtype for numeric/boolean columns
+        dates: columns to parse as datetimes
+        null: token the export uses for missing values (DodoPayments writes NULL)
+        key: natural key of a row, used to drop rows repeated across overlapping exports
+
+    Columns missing from the file are skipped. If a value does not fit its declared dtype
+    the file is re-read without dtypes and `_prepare_data` coerces it as before.
+
+    csv_path may also be a glob pattern or a list (e.g. one export per month). The files are
+    read in parallel, concatenated once and de-duplicated on the schema key, keeping the row
+    from the last file in sorted order. Rows without a key are all kept.
+    """
+    paths = resolve_csv_paths(csv_path)
+    if len(paths) == 1:
+        return _read_csv_file(paths[0], schema)
+
+    with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+        frames = list(pool.map(lambda path: _read_csv_file(path, schema), paths))
+
+    # Give each categorical column the same categories in every file, otherwise concat falls back to object
+    for col in frames[0].columns:
+        if any(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = pd.api.types.union_categoricals(
+                [frame[col].astype('category') for frame in frames]
+            ).categories
+            for frame in frames:
+                frame[col] = frame[col].astype(pd.CategoricalDtype(categories))
+
+    df = pd.concat(frames, ignore_index=True)
+    del frames
+
+    key = schema.get('key')
+    if key and key in df.columns:
+        df = drop_repeated_rows(df, key).reset_index(drop=True)
+    return df
+
+def drop_repeated_rows(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Drops rows whose key appears again further down, keeping the last one. Rows with a missing
+    key are not repeats of each other, so they are all kept.
+    """
+    repeated = df[key].duplicated(keep='last') & df[key].notna()
+    return df[~repeated.to_numpy()] if repeated.any() else df
+
+def _read_csv_file(csv_path: str, schema: Dict) -> pd.DataFrame:
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [col for col in schema['usecols'] if col in header]
+    dtypes = {col: dtype for col, dtype in schema.get('dtypes', {}).items() if col in usecols}
+    dates = [col for col in schema.get('dates', []) if col in usecols]
+
+    read_kwargs = {
+        'engine': CSV_ENGINE,
+        'usecols': usecols,
+        'na_values': [schema.get('null', 'NULL')],
+    }
+
+    try:
+        return pd.read_csv(csv_path, dtype=dtypes, parse_dates=dates, **read_kwargs)
+    except (ValueError, TypeError):
+        return pd.read_csv(csv_path, **read_kwargs)
+
+def sidecar_path(csv_path: Union[str, List[str]], fmt: str, kind: str = 'prepared', version: str = '') -> str:
+    """
+    Path of a hidden sidecar file next to the (first) CSV, keyed by every input's size and mtime
+    and by `version`, which should change whenever the code producing the sidecar does.
+    """
+    paths = resolve_csv_paths(csv_path)
+
+    digest = hashlib.sha1(version.encode('utf-8'))
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode('utf-8'))
+
+    directory, name = os.path.split(paths[0])
+    return os.path.join(directory, f".{name}.{digest.hexdigest()[:16]}.{kind}.{fmt}")
+
+def analyzer_version(gen) -> str:
+    """
+    Digest of the analyzer's source file, so sidecars are rebuilt when _prepare_data changes.
+    Generators whose partials also depend on state outside the CSV expose it as `_sidecar_salt`.
+    """
+    with open(sys.modules[type(gen).__module__].__file__, 'rb') as f:
+        version = hashlib.sha1(f.read()).hexdigest()
+    salt = getattr(gen, '_sidecar_salt', '')
+    return hashlib.sha1(f"{version}\0{salt}".encode('utf-8')).hexdigest() if salt else version
+
+def _read_table(path: str, fmt: str):
+    if fmt == 'feather':
+        from pyarrow import feather
+        return feather.read_table(path, memory_map=True)
+    from pyarrow import parquet
+    return parquet.read_table(path, memory_map=True)
+
+def read_columnar(path: str, fmt: str) -> pd.DataFrame:
+    """Reads a Feather/Parquet file through a memory map instead of copying it into memory first."""
+    # split_blocks lets numeric columns without nulls point straight into the mapped file
+    return _read_table(path, fmt).to_pandas(split_blocks=True)
+
+def remove_stale_sidecars(csv_path: Union[str, List[str]], keep: str, fmt: str, kind: str = 'prepared'):
+    """Removes sidecars written for older versions of the CSV."""
+    directory, name = os.path.split(resolve_csv_paths(csv_path)[0])
+    for stale in glob.glob(os.path.join(glob.escape(directory), f".{glob.escape(name)}.*.{kind}.{fmt}")):
+        if stale != keep:
+            os.remove(stale)
+
+def write_columnar(df: pd.DataFrame, path: str, fmt: str, preserve_index: bool = False,
+                   metadata: Optional[Dict[str, str]] = None):
+    """
+    Writes a Feather/Parquet file atomically, so readers never see a partial file. With
+    preserve_index the (multi-)index is stored too and restored by read_columnar; `metadata`
+    is kept in the file's schema.
+    """
+    import pyarrow
+
+    table = pyarrow.Table.from_pandas(df if preserve_index else df.reset_index(drop=True),
+                                      preserve_index=preserve_index)
+    if metadata:
+        encoded = {key.encode('utf-8'): value.encode('utf-8') for key, value in metadata.items()}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **encoded})
+
+    tmp_path = f"{path}.tmp"
+    if fmt == 'feather':
+        from pyarrow import feather
+        # Uncompressed so the file can be memory-mapped without decoding
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+    else:
+        from pyarrow import parquet
+        parquet.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+class DatasetRegistry:
+    """
+    Process-wide cache of parsed exports, so every Generator reading an export parses it once,
+    whichever analyzer it belongs to.
+
+    Entries are keyed by the input files (with their size and mtime), the export's null token and
+    its row key, and hold the typed raw columns (read_csv_typed) every schema asked for so far; a
+    schema needing columns nobody parsed yet only has those parsed and added. Each Generator gets
+    a copy-on-write shallow copy of its own columns and prepares it itself, so _prepare_data of
+    one analyzer never shows up in another's frame.
+
+    Every Generator holding an entry counts as a reference, released when the Generator is
+    garbage collected. Entries nobody references stay cached for later reports until the total
+    size goes over the memory budget; then the least recently used of them are dropped. Entries
+    in use are never dropped, since their memory could not be freed anyway.
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_MEMORY_BUDGET_MB):
+        self.budget_mb = budget_mb
+        # key -> [frame, size in bytes, reference count, column -> declared type, columns asked for]
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def acquire(self, gen, csv_path: Union[str, List[str]], schema: Dict) -> pd.DataFrame:
+        """
+        Returns a shallow copy of the schema's columns of csv_path, parsing whatever is not cached
+        yet. The reference is released when gen is garbage collected.
+        """
+        # Copies share the cached data, so copy-on-write must protect it from in-place changes
+        enable_copy_on_write()
+        key = self._key(csv_path, schema)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [None, 0, 0, {}, set()]
+                self._drop_older_versions(key)
+                self._entries[key] = entry
+            self._add_columns(entry, csv_path, schema)
+            self._entries.move_to_end(key)
+            entry[2] += 1
+            weakref.finalize(gen, self.release, key)
+            self._evict()
+            return self._view(entry, schema)
+
+    def cached(self, csv_path: Union[str, List[str]], schema: Dict) -> Optional[pd.DataFrame]:
+        """The schema's columns of csv_path if all of them are cached already, else None. Never parses."""
+        try:
+            key = self._key(csv_path, schema)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not set(schema['usecols']) <= entry[4]:
+                return None
+            self._entries.move_to_end(key)
+            return self._view(entry, schema)
+
+    def release(self, key: Tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] -= 1
+                self._evict()
+
+    def clear(self):
+        """Drops every entry nobody references."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] <= 0]:
+                del self._entries[key]
+
+    @staticmethod
+    def _key(csv_path: Union[str, List[str]], schema: Dict) -> Tuple:
+        stats = [(os.path.abspath(path), os.stat(path)) for path in resolve_csv_paths(csv_path)]
+        files = tuple((path, stat.st_size, stat.st_mtime_ns) for path, stat in stats)
+        return files, schema.get('null', 'NULL'), schema.get('key')
+
+    @staticmethod
+    def _column_types(schema: Dict) -> Dict[str, Optional[str]]:
+        """Declared type of each schema column: 'date', a dtype, or None for text."""
+        dates = set(schema.get('dates', []))
+        return {col: 'date' if col in dates else schema.get('dtypes', {}).get(col) for col in schema['usecols']}
+
+    def _add_columns(self, entry: List, csv_path: Union[str, List[str]], schema: Dict):
+        """Parses the schema's columns the entry does not have yet and adds them to it."""
+        missing = [col for col in schema['usecols'] if col not in entry[4]]
+        if not missing:
+            return
+
+        types = {**self._column_types(schema), **entry[3]}
+        key = schema.get('key')
+        # The key comes along, so the new columns can be checked to line up row for row
+        usecols = missing + ([key] if key and key not in missing else [])
+        parsed = read_csv_typed(csv_path, self._schema_for(schema, usecols, types))
+
+        frame = entry[0]
+        if frame is None:
+            frame = parsed
+        elif len(parsed) == len(frame) and (key not in frame.columns or parsed[key].equals(frame[key])):
+            frame = pd.concat([frame, parsed.drop(columns=[col for col in parsed.columns if col in frame.columns])], axis=1)
+        else:
+            # Rows differ (e.g. the key is missing from the file): parse everything asked for together
+            frame = read_csv_typed(csv_path, self._schema_for(schema, sorted(entry[4] | set(usecols)), types))
+
+        entry[0] = frame
+        entry[1] = int(frame.memory_usage(deep=True).sum())
+        entry[3] = {col: types[col] for col in entry[4] | set(usecols) if col in types}
+        entry[4].update(schema['usecols'])
+
+    @staticmethod
+    def _schema_for(schema: Dict, usecols: List[str], types: Dict[str, Optional[str]]) -> Dict:
+        return {
+            **schema,
+            'usecols': usecols,
+            'dtypes': {col: types[col] for col in usecols if types.get(col) not in (None, 'date')},
+            'dates': [col for col in usecols if types.get(col) == 'date'],
+        }
+
+    def _view(self, entry: List, schema: Dict) -> pd.DataFrame:
+        """
+        Shallow copy of the schema's columns (those in the file). Columns cached with a different
+        declared type than this schema's are converted; if that fails _prepare_data coerces them.
+        """
+        frame = entry[0]
+        view = frame[[col for col in schema['usecols'] if col in frame.columns]]
+        for col, declared in self._column_types(schema).items():
+            if col not in view.columns or declared is None or declared == entry[3].get(col):
+                continue
+            try:
+                view[col] = pd.to_datetime(view[col], errors='coerce') if declared == 'date' else view[col].astype(declared)
+            except (ValueError, TypeError):
+                pass
+        return view
+
+    def _drop_older_versions(self, key: Tuple):
+        """Drops unreferenced entries for earlier versions of the same files."""
+        paths = tuple(path for path, _, _ in key[0])
+        for other in list(self._entries):
+            entry = self._entries[other]
+            if entry[2] <= 0 and other[1:] == key[1:] and tuple(path for path, _, _ in other[0]) == paths:
+                del self._entries[other]
+
+    def _evict(self):
+        budget = self.budget_mb * 1024 ** 2
+        total = sum(entry[1] for entry in self._entries.values())
+        # OrderedDict keeps least recently used entries first
+        for key in list(self._entries):
+            if total <= budget:
+                break
+            entry = self._entries[key]
+            if entry[2] <= 0:
+                total -= entry[1]
+                del self._entries[key]
+
+# Shared by every Generator in this process
+registry = DatasetRegistry()
+
+def _check_sidecar(sidecar: Optional[str]):
+    if sidecar is not None and sidecar not in SIDECAR_FORMATS:
+        raise ValueError(f"Unknown sidecar format: {sidecar}")
+    if sidecar is not None and not HAS_PYARROW:
+        raise ImportError("Sidecar caching requires pyarrow (pip install pyarrow)")
+
+def _store_format(path: str) -> str:
+    fmt = os.path.splitext(path)[1].lstrip('.')
+    _check_sidecar(fmt)
+    return fmt
+
+def load_rollup_store(path: str) -> Optional[pd.DataFrame]:
+    """Reads a persisted aggregate (Feather or Parquet, by file extension), or None if there is none yet."""
+    fmt = _store_format(path)
+    if not os.path.exists(path):
+        return None
+    return read_columnar(path, fmt)
+
+def save_rollup_store(df: pd.DataFrame, path: str):
+    """Writes a persisted aggregate, index included, replacing the previous one atomically."""
+    write_columnar(df, path, _store_format(path), preserve_index=True)
+
+def load_partials(gen, csv_path: Union[str, List[str]], sidecar: str) -> bool:
+    """
+    Loads every partial aggregate in gen._PARTIALS from its sidecar into gen._partials and sets
+    gen.row_count. Returns False, leaving gen untouched, unless all of them are there.
+    """
+    version = analyzer_version(gen)
+    paths = {name: sidecar_path(csv_path, sidecar, kind=name, version=version) for name in gen._PARTIALS}
+    if not all(os.path.exists(path) for path in paths.values()):
+        return False
+
+    partials = {}
+    for name, path in paths.items():
+        table = _read_table(path, sidecar)
+        partials[name] = table.to_pandas(split_blocks=True)
+        row_count = int(table.schema.metadata[b'row_count'])
+
+    gen._partials = partials
+    gen.row_count = row_count
+    return True
+
+def save_partials(gen, csv_path: Union[str, List[str]], sidecar: str, row_count: int):
+    """Saves gen._partials next to the CSV, so load_partials can skip aggregating on later runs."""
+    version = analyzer_version(gen)
+    for name, partial in gen._partials.items():
+        path = sidecar_path(csv_path, sidecar, kind=name, version=version)
+        write_columnar(partial, path, sidecar, preserve_index=True, metadata={'row_count': str(row_count)})
+        remove_stale_sidecars(csv_path, path, sidecar, kind=name)
+
+def load_prepared(gen, csv_path: Union[str, List[str]], sidecar: Optional[str] = None):
+    """
+    Sets gen.df to the prepared dataset for csv_path: the export's columns shared through the
+    dataset registry, prepared by gen._prepare_data() on gen's own copy-on-write copy.
+
+    With sidecar='feather' or 'parquet' the prepared frame is also saved
+    next to the CSV, and later runs memory-map it instead of parsing and preparing the CSV
+    again. The sidecar is keyed by the CSV's size and mtime, so a new export is always re-parsed.
+    The Generator's partial aggregates (_PARTIALS) are saved and reused the same way.
+    """
+    _check_sidecar(sidecar)
+    gen.df = _load_prepared(gen, csv_path, sidecar)
+
+    if sidecar is not None and getattr(gen, '_PARTIALS', None) and not load_partials(gen, csv_path, sidecar):
+        for name in gen._PARTIALS:
+            partial_aggregate(gen, name)
+        save_partials(gen, csv_path, sidecar, len(gen.df))
+
+def _load_prepared(gen, csv_path: Union[str, List[str]], sidecar: Optional[str]) -> pd.DataFrame:
+    if sidecar is not None:
+        path = sidecar_path(csv_path, sidecar, version=analyzer_version(gen))
+        if os.path.exists(path):
+            return read_columnar(path, sidecar)
+
+    gen.df = registry.acquire(gen, csv_path, gen.SCHEMA)
+    gen._prepare_data()
+    if sidecar is not None:
+        write_columnar(gen.df, path, sidecar)
+        remove_stale_sidecars(csv_path, path, sidecar)
+    return gen.df
+
+def iter_csv_chunks(csv_path: Union[str, List[str]], schema: Dict, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads an export (or every file of a glob/list, one after another) in chunks of `chunksize`
+    rows, restricted to the schema's columns.
+
+    Values are not forced to their declared dtypes here, because one bad value would abort the
+    stream half-way; `_prepare_data` coerces each chunk instead. Rows repeated across files are
+    only de-duplicated within a chunk, since remembering every key would defeat streaming.
+
+    If another Generator in this process already parsed these columns of the export, the chunks
+    are slices of that cached frame instead of being parsed again.
+    """
+    cached = registry.cached(csv_path, schema)
+    if cached is not None:
+        for start in range(0, len(cached), chunksize):
+            yield cached.iloc[start:start + chunksize]
+        return
+
+    key = schema.get('key')
+    for path in resolve_csv_paths(csv_path):
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [col for col in schema['usecols'] if col in header]
+        dates = [col for col in schema.get('dates', []) if col in usecols]
+
+        # The pyarrow engine cannot stream, so chunks always go through the C parser
+        for chunk in pd.read_csv(path, usecols=usecols, parse_dates=dates,
+                                 na_values=[schema.get('null', 'NULL')], chunksize=chunksize):
+            if key and key in chunk.columns:
+                chunk = drop_repeated_rows(chunk, key)
+            yield chunk
+
+def load_streaming(gen, csv_path: Union[str, List[str]], chunksize: int, sidecar: Optional[str] = None):
+    """
+    Streams csv_path through gen in chunks, keeping only its mergeable partial aggregates.
+
+    Each chunk is prepared with gen._prepare_data() and reduced with every builder in
+    gen._PARTIALS. Afterwards gen.df is None, gen._partials holds the merged aggregates and
+    gen.row_count the number of rows read, so memory use depends on chunksize, not file size.
+    With a sidecar format the merged aggregates are saved next to the CSV, and later runs load
+    them without reading the CSV at all.
+    """
+    _check_sidecar(sidecar)
+    # Remembered so analyses that need every row can stream the export again (iter_prepared_frames)
+    gen._stream_source = (csv_path, chunksize)
+    gen.df = None
+    if sidecar is not None and load_partials(gen, csv_path, sidecar):
+        return
+
+    gen._partials = {}
+    gen.row_count = 0
+
+    for chunk in iter_csv_chunks(csv_path, gen.SCHEMA, chunksize):
+        _accumulate(gen, chunk)
+
+    if gen.row_count == 0:
+        # Header-only export: build empty partials so analyses still return empty tables
+        _accumulate(gen, read_csv_typed(csv_path, gen.SCHEMA))
+
+    gen.df = None
+    if sidecar is not None:
+        save_partials(gen, csv_path, sidecar, gen.row_count)
+
+def _accumulate(gen, chunk: pd.DataFrame):
+    gen.df = chunk
+    gen._prepare_data()
+
+    for name, (builder, how) in gen._PARTIALS.items():
+        partial = getattr(gen, builder)(gen.df)
+        gen._partials[name] = merge_partials(gen._partials.get(name), partial, how)
+    gen.row_count += len(chunk)
+
+def iter_prepared_frames(gen, chunksize: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """
+    Yields gen's prepared data in pieces: slices of gen.df of `chunksize` rows, or in streaming
+    mode each chunk of the export prepared by a throwaway Generator, so gen is never modified
+    and analyses can run concurrently.
+    """
+    if gen.df is not None:
+        for start in range(0, len(gen.df), chunksize):
+            yield gen.df.iloc[start:start + chunksize]
+        return
+
+    csv_path, chunksize = gen._stream_source
+    for chunk in iter_csv_chunks(csv_path, gen.SCHEMA, chunksize):
+        yield type(gen)(df=chunk, copy=False).df
+
+def spill_partitioned(partials: Iterator[pd.DataFrame], partitions: int, how: Dict[str, str]) -> Iterator[pd.DataFrame]:
+    """
+    Hash-partitions grouped partial aggregates to temporary files and yields each partition fully
+    merged, one at a time.
+
+    Every partial is indexed by the group key; rows are routed by a hash of that key, so all rows
+    of a group land in the same partition and each yielded frame is final for its groups. Only one
+    partition is held in memory at a time. The spill files are removed once iteration ends.
+    """
+    with tempfile.TemporaryDirectory(prefix='spill-') as spill_dir:
+        paths = [os.path.join(spill_dir, f"{i}.pkl") for i in range(partitions)]
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(path, 'wb')) for path in paths]
+            for partial in partials:
+                part = pd.util.hash_pandas_object(partial.index, index=False).to_numpy() % partitions
+                for i, group in partial.groupby(part):
+                    pickle.dump(group, files[i], protocol=pickle.HIGHEST_PROTOCOL)
+
+        for path in paths:
+            frames = []
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        frames.append(pickle.load(f))
+                    except EOFError:
+                        break
+            if frames:
+                # One merge per partition rather than one per spilled frame
+                merged = pd.concat(frames)
+                del frames
+                yield merged.groupby(level=list(range(merged.index.nlevels)), observed=True, dropna=False).agg(how)
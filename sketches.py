@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional
+
+# Counters kept per sketch when an analysis does not set its own capacity
+DEFAULT_CAPACITY = 1000
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch: tracks at most `capacity` keys with their (weighted) counts,
+    however many distinct keys the stream has.
+
+    Chunks are aggregated exactly and merged into the sketch, keeping the `capacity` largest
+    counters. A key that was not tracked when a chunk arrived is credited with `floor`, the most
+    any untracked key can have, so each count is an upper bound and `error` says by how much it
+    may be too high: the true count lies in [count - error, count]. Untracked keys have at most
+    `floor`. Sketches of separate streams can be merged the same way.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counters = pd.DataFrame({'count': pd.Series(dtype='float64'), 'error': pd.Series(dtype='float64')})
+        self.floor = 0.0
+        self.total = 0.0
+
+    def update(self, keys: pd.DataFrame, weights: Optional[pd.Series] = None):
+        """Adds one chunk: a row per event with its key column(s), weighted by `weights` (default 1)."""
+        if weights is None:
+            weights = pd.Series(1.0, index=keys.index)
+        counts = weights.groupby([keys[col] for col in keys.columns], observed=True, sort=False).sum()
+        self.total += float(counts.sum())
+        self._merge(pd.DataFrame({'count': counts.astype('float64'), 'error': 0.0}), 0.0)
+
+    def merge(self, other: 'SpaceSaving'):
+        """Folds in a sketch of another part of the stream."""
+        self.total += other.total
+        self._merge(other.counters, other.floor)
+
+    def _merge(self, counters: pd.DataFrame, floor: float):
+        if self.counters.empty:
+            # Nothing to combine yet; this also takes on the index levels of the keys
+            combined = counters.copy()
+        else:
+            # Summing a marker per side tells which side each key came from, without an isin over the keys
+            combined = pd.concat([self.counters.assign(ours=1, theirs=0), counters.assign(ours=0, theirs=1)])
+            combined = combined.groupby(level=list(range(combined.index.nlevels)), sort=False).sum()
+
+            # A key missing from one side may have had up to that side's floor there
+            credit = (combined.pop('ours') == 0) * self.floor + (combined.pop('theirs') == 0) * floor
+            combined['count'] += credit
+            combined['error'] += credit
+
+        floor = self.floor + floor
+        if len(combined) > self.capacity:
+            ranked = combined.sort_values('count', ascending=False, kind='stable')
+            floor = max(floor, float(ranked['count'].iloc[self.capacity]))
+            combined = ranked.iloc[:self.capacity]
+
+        self.counters = combined
+        self.floor = floor
+
+    def top(self, n: int) -> pd.DataFrame:
+        """The n largest counters, largest first, with their error bounds."""
+        return self.counters.sort_values('count', ascending=False, kind='stable').head(n)
+
+def heavy_hitters(frames: Iterator[pd.DataFrame], keys: List[str], weight: Optional[str] = None,
+                  capacity: int = DEFAULT_CAPACITY) -> SpaceSaving:
+    """One pass over `frames` counting rows (or summing `weight`) per value of `keys` in a Space-Saving sketch."""
+    sketch = SpaceSaving(capacity)
+    for frame in frames:
+        sketch.update(frame[keys], frame[weight] if weight else None)
+    return sketch
+
+def sketch_capacity(approx: Dict[str, Optional[int]], analysis: str, mode: Optional[str] = None) -> Optional[int]:
+    """
+    Sketch capacity `analysis` should run with, or None to compute it exactly. `mode` ('exact' or
+    'approx') overrides the Generator's `approx` option, which maps analyses to their capacity.
+    """
+    if mode is None:
+        mode = 'approx' if analysis in approx else 'exact'
+    if mode not in ('exact', 'approx'):
+        raise ValueError(f"Unknown mode: {mode}")
+    return (approx.get(analysis) or DEFAULT_CAPACITY) if mode == 'approx' else None
+
+# Relative accuracy of quantile sketches: every quantile they report is within 1% of the true one
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Magnitudes below this fall into the zero bucket
+MIN_INDEXABLE = 1e-9
+
+# Percentiles listed in percentile tables
+PERCENTILES = (50, 90, 99)
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch in the style of DDSketch: values are counted in logarithmically
+    sized buckets, so any quantile is within `relative_accuracy` of the true value however many
+    values were added, and sketches of separate chunks or partitions merge by adding up buckets.
+
+    `buckets` is indexed by bucket key, which sorts like the values in the bucket (negative keys
+    for negative values, 0 for zero), and keeps each bucket's count, smallest and largest value.
+    Quantiles are clamped to those, so buckets holding a single distinct value are exact.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        # Keys of positive buckets start at 1, leaving 0 for the zero bucket
+        self._bias = 1 - int(np.ceil(np.log(MIN_INDEXABLE) / self._log_gamma))
+        self.buckets = pd.DataFrame({
+            'count': pd.Series(dtype='int64'), 'min': pd.Series(dtype='float64'), 'max': pd.Series(dtype='float64')
+        })
+
+    @classmethod
+    def from_buckets(cls, buckets: pd.DataFrame, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> 'QuantileSketch':
+        """A sketch over bucket counts built elsewhere with bucket_keys, e.g. a merged partial aggregate."""
+        sketch = cls(relative_accuracy)
+        sketch.buckets = buckets[['count', 'min', 'max']].sort_index()
+        return sketch
+
+    @property
+    def count(self) -> int:
+        return int(self.buckets['count'].sum())
+
+    def bucket_keys(self, values: pd.Series) -> np.ndarray:
+        """The bucket key of every (non-null) value."""
+        values = values.to_numpy(dtype='float64')
+        magnitude = np.abs(values)
+        with np.errstate(divide='ignore'):
+            keys = np.ceil(np.log(magnitude) / self._log_gamma) + self._bias
+        keys = np.where(magnitude < MIN_INDEXABLE, 0, keys)
+        return (np.sign(values) * keys).astype('int64')
+
+    def update(self, values: pd.Series):
+        """Adds a chunk of values; nulls are skipped."""
+        values = values.dropna()
+        buckets = values.groupby(self.bucket_keys(values)).agg(['count', 'min', 'max'])
+        self._add(buckets)
+
+    def merge(self, other: 'QuantileSketch'):
+        """Folds in a sketch of another chunk or partition, built with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        self._add(other.buckets)
+
+    def _add(self, buckets: pd.DataFrame):
+        combined = pd.concat([self.buckets, buckets]) if not self.buckets.empty else buckets
+        self.buckets = combined.groupby(level=0).agg({'count': 'sum', 'min': 'min', 'max': 'max'})
+
+    def _values_at(self, ranks: np.ndarray) -> np.ndarray:
+        """The value of rank r (0-based, in sorted order) for each rank, clamped to its bucket."""
+        cumulative = self.buckets['count'].cumsum().to_numpy()
+        position = np.searchsorted(cumulative, ranks, side='right')
+        keys = self.buckets.index.to_numpy()[position]
+
+        exponent = np.abs(keys) - self._bias
+        value = np.sign(keys) * 2 * self.gamma ** exponent / (self.gamma + 1)
+        return np.clip(value, self.buckets['min'].to_numpy()[position], self.buckets['max'].to_numpy()[position])
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Quantiles (0 to 1), interpolated between neighbouring ranks like Series.quantile."""
+        qs = np.asarray(qs, dtype='float64')
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+
+        rank = qs * (self.count - 1)
+        lower, upper = np.floor(rank), np.ceil(rank)
+        low, high = self._values_at(lower), self._values_at(upper)
+        return low + (high - low) * (rank - lower)
+
+def percentile_table(sketches: Dict[str, QuantileSketch], percentiles=PERCENTILES) -> pd.DataFrame:
+    """One row per percentile ('P50', ...) and one column per sketch."""
+    table = pd.DataFrame({'Percentile': [f"P{p}" for p in percentiles]})
+    for name, sketch in sketches.items():
+        table[name] = sketch.quantiles([p / 100 for p in percentiles]).round(2)
+    return table
+
+def quantile_sketch(frames: Iterator[pd.DataFrame], column: str,
+                    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> QuantileSketch:
+    """One pass over `frames` sketching the distribution of `column`."""
+    sketch = QuantileSketch(relative_accuracy)
+    for frame in frames:
+        sketch.update(frame[column])
+    return sketch
@@ -0,0 +1,18 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import datasets
+
+@pytest.fixture
+def exports(tmp_path):
+    """Copies of the sample exports in reports/, so each test parses (and caches) its own files."""
+    for name in os.listdir(os.path.join(ROOT, "reports")):
+        shutil.copy(os.path.join(ROOT, "reports", name), tmp_path / name)
+    yield tmp_path
+    datasets.registry.clear()
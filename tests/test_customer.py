@@ -0,0 +1,32 @@
+import pandas as pd
+
+from analyzers.customer import Generator
+
+def customers(names, emails) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Customer ID': [f"cus_{i}" for i in range(len(names))],
+        'Customer Name': names,
+        'Customer Email': emails,
+        'Success Orders Count': 1,
+        'Success Orders Amount': 100.0,
+        'Settlement Currency': 'INR',
+        'Total Refunds Count': 0,
+        'Total Refunds Amount': 0.0,
+        'Total Disputes Count': 0,
+        'Total Disputes Amount': 0.0,
+    })
+
+def test_pairs_score_on_mailbox_and_name_with_mailbox_name():
+    gen = Generator(df=customers(
+        ['Jane Doe', 'Someone Else', 'JOHN  SMITH', 'John Smith', 'John Smith', 'Ann Lee'],
+        ['jane.doe@gmail.com', 'janedoe+shop@googlemail.com', 'jsmith@yahoo.com', 'jsmith@gmail.com',
+         'john@example.com', 'jsmith@outlook.com'],
+    ))
+    result = gen.duplicate_customer_clusters()
+
+    # The same name alone (cus_4) or the same mailbox name alone (cus_5) is not a match
+    assert sorted(result['Customer Emails']) == [
+        'jane.doe@gmail.com, janedoe+shop@googlemail.com',
+        'jsmith@yahoo.com, jsmith@gmail.com',
+    ]
+    assert sorted(result['Matched On']) == ['Email', 'Name and Mailbox Name']
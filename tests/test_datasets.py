@@ -0,0 +1,40 @@
+import pandas as pd
+
+import datasets
+from analyzers.payments import Generator as Payments
+from analyzers.refunds import Generator as Refunds
+
+def count_reads(monkeypatch):
+    """Patches pd.read_csv in datasets to count full reads per file (header-only reads are not counted)."""
+    reads = {}
+    read_csv = pd.read_csv
+
+    def counting(path, *args, **kwargs):
+        if kwargs.get('nrows') != 0:
+            reads[str(path)] = reads.get(str(path), 0) + 1
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(datasets.pd, 'read_csv', counting)
+    return reads
+
+def test_refunds_link_reuses_the_payments_parse(exports, monkeypatch):
+    reads = count_reads(monkeypatch)
+    payments_csv = str(exports / 'payments-report.csv')
+
+    payments = Payments(csv_path=payments_csv)
+    refunds = Refunds(csv_path=str(exports / 'refunds-report.csv'), payments_csv=payments_csv)
+
+    assert reads[payments_csv] == 1
+    assert refunds.refund_rate_by_currency()['Payments'].sum() == (payments.df['Payment Status'] == 'succeeded').sum()
+
+def test_rows_without_a_key_are_kept(tmp_path):
+    pd.DataFrame({'ID': ['a', 'NULL', 'b'], 'Value': [1, 2, 3]}).to_csv(tmp_path / '1.csv', index=False)
+    pd.DataFrame({'ID': ['a', 'NULL'], 'Value': [4, 5]}).to_csv(tmp_path / '2.csv', index=False)
+    schema = {'usecols': ['ID', 'Value'], 'key': 'ID'}
+
+    df = datasets.read_csv_typed(str(tmp_path / '*.csv'), schema)
+    assert sorted(df['Value']) == [2, 3, 4, 5]
+
+    # Streaming only de-duplicates within a chunk, but never drops a row without a key
+    chunks = pd.concat(datasets.iter_csv_chunks(str(tmp_path / '*.csv'), schema, chunksize=10))
+    assert sorted(chunks.loc[chunks['ID'].isna(), 'Value']) == [2, 5]
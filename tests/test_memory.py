@@ -0,0 +1,17 @@
+import os
+import importlib
+
+import pytest
+
+from benchmarks.memory import ANALYZERS, MAX_RATIO, ROOT, input_mb, peak_mb, tiled_frame
+
+# Large enough that fixed overhead does not dominate the ratio (see MAX_RATIO)
+REPEAT = 200
+
+@pytest.mark.parametrize('name', sorted(ANALYZERS))
+def test_peak_memory_stays_within_its_ratio(name):
+    gen_class = importlib.import_module(f"analyzers.{name}").Generator
+    df = tiled_frame(gen_class, os.path.join(ROOT, ANALYZERS[name]), REPEAT)
+
+    ratio = peak_mb(gen_class, df, copy=False) / input_mb(df)
+    assert ratio <= MAX_RATIO[name]
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from analyzers.reconciliation import Generator
+
+def test_only_true_flags_count_as_credits(tmp_path):
+    ledger = tmp_path / 'ledger.csv'
+    pd.DataFrame({
+        'Ledger Entry ID': ['led_1', 'led_2', 'led_3'],
+        'Event Type': ['payment', 'payment', 'payment'],
+        'Amount': [10.0, 50.0, 20.0],
+        'Is Credit': ['true', 'false', 'NULL'],
+        'Reference Object ID': ['obj_1', 'obj_1', 'obj_1'],
+    }).to_csv(ledger, index=False)
+
+    for chunksize in (1, 10):
+        gen = Generator(csv_path=str(ledger), chunksize=chunksize)
+        unmatched = gen.unmatched_ledger_entries()
+        assert unmatched['Ledger Entries'].tolist() == [3]
+        assert unmatched['Net Amount'].tolist() == [10.0 - 50.0 - 20.0]
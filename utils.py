@@ -1,5 +1,9 @@
 import inspect
-from typing import Dict, Callable
+import threading
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Callable, List, Optional
 from datetime import datetime
 
 def extract_method_info(func: Callable) -> Dict[str, str]:
@@ -18,57 +22,142 @@ def extract_method_info(func: Callable) -> Dict[str, str]:
         'description': description
     }
 
-def run_all_analyses(self, output_path: str = './payment_analysis_report.md') -> str:
+def merge_partials(total: Optional[pd.DataFrame], partial: pd.DataFrame, how: Dict[str, str]) -> pd.DataFrame:
     """
-    Runs all analysis methods and generates a comprehensive markdown report.
+    Merges one chunk's grouped partial aggregates into the running total.
 
-    Returns:
-        str: Path to the generated markdown file
+    `how` maps every column to the function that combines it across chunks ('sum', 'min' or 'max'),
+    so counts and sums add up and means can be finalized later as sum / count.
+    """
+    if total is None:
+        return partial
+    levels = list(range(partial.index.nlevels))
+    # Keep groups whose key is missing (e.g. a NULL payment method type) instead of dropping them
+    return pd.concat([total, partial]).groupby(level=levels, observed=True, dropna=False).agg(how)
+
+def partial_aggregate(self, name: str) -> pd.DataFrame:
     """
-    # Get all analysis methods (exclude private methods and run_all_analyses)
-    analysis_methods = [
+    Returns the partial aggregate `name` declared in the Generator's _PARTIALS.
+
+    In streaming mode (no self.df) this is the total merged across all chunks; otherwise it is
+    built from self.df the first time it is needed and then reused, so both modes finalize the
+    same table and several analyses can share one aggregation pass.
+    """
+    if self.df is None:
+        return self._partials[name]
+
+    # setdefault is atomic, so concurrent analyses agree on one cache and one lock
+    partials = self.__dict__.setdefault('_partials', {})
+    with self.__dict__.setdefault('_partials_lock', threading.Lock()):
+        if name not in partials:
+            builder, _ = self._PARTIALS[name]
+            partials[name] = getattr(self, builder)(self.df)
+        return partials[name]
+
+def _analysis_methods(self) -> List[str]:
+    """Lists public analysis methods in a deterministic (alphabetical) order."""
+    # Exclude private methods and run_all_analyses
+    methods = [
         method for method in dir(self)
         if callable(getattr(self, method))
            and not method.startswith('_')
            and method != 'run_all_analyses'
     ]
 
-    sections = []
+    # In streaming mode only analyses backed by partial aggregates can run
+    if self.df is None:
+        methods = [method for method in methods if method in getattr(self, 'STREAMING_ANALYSES', ())]
+    return methods
+
+def _render_section(self, method_name: str) -> str:
+    """Runs a single analysis method and renders it as a markdown section."""
+    try:
+        method = getattr(self, method_name)
+        method_info = extract_method_info(method)
+
+        # Execute analysis
+        result_df = method()
+
+        # Convert to markdown
+        if not result_df.empty:
+            markdown_table = result_df.to_markdown(index=False, floatfmt='.2f')
+        else:
+            markdown_table = "*No data available for this analysis*"
+
+        # Create section
+        section = f"## {method_info['title']}\n\n"
+        section += f"{method_info['description']}\n\n"
+        section += f"{markdown_table}\n\n"
+        return section
+
+    except Exception as e:
+        # Log error but continue with other analyses
+        error_section = f"## {method_name.replace('_', ' ').title()}\n\n"
+        error_section += f"*Error during analysis: {str(e)}*\n\n"
+        return error_section
+
+# Generator shared with forked worker processes; set by _init_worker
+_worker_generator = None
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+def _render_in_worker(method_name: str) -> str:
+    return _render_section(_worker_generator, method_name)
+
+def run_all_analyses(self, output_path: str = './payment_analysis_report.md',
+                     executor: Optional[str] = None, max_workers: Optional[int] = None) -> str:
+    """
+    Runs all analysis methods and generates a comprehensive markdown report.
+
+    Args:
+        executor: None to run analyses one at a time, 'thread' to run them in a thread pool,
+            or 'process' to run them in forked worker processes that share the prepared data.
+        max_workers: Pool size for the thread/process executors.
+
+    Returns:
+        str: Path to the generated markdown file
+    """
+    if executor not in (None, 'thread', 'process'):
+        raise ValueError(f"Unknown executor: {executor}")
+
+    # Processes share the prepared DataFrame through fork; fall back to threads elsewhere
+    if executor == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+        executor = 'thread'
+
+    analysis_methods = _analysis_methods(self)
+
+    sections = {}
 
     # Generate header
     header = f"# {self.report_title}\n\nGenerated: {datetime.utcnow().isoformat()} UTC\n\n"
-    header += f"**Dataset Summary:** {len(self.df)} transactions analyzed\n\n"
-
-    # Run each analysis
-    for method_name in analysis_methods:
-        try:
-            method = getattr(self, method_name)
-            method_info = extract_method_info(method)
-
-            # Execute analysis
-            result_df = method()
-
-            # Convert to markdown
-            if not result_df.empty:
-                markdown_table = result_df.to_markdown(index=False, floatfmt='.2f')
-            else:
-                markdown_table = "*No data available for this analysis*"
-
-            # Create section
-            section = f"## {method_info['title']}\n\n"
-            section += f"{method_info['description']}\n\n"
-            section += f"{markdown_table}\n\n"
-
-            sections.append(section)
-
-        except Exception as e:
-            # Log error but continue with other analyses
-            error_section = f"## {method_name.replace('_', ' ').title()}\n\n"
-            error_section += f"*Error during analysis: {str(e)}*\n\n"
-            sections.append(error_section)
-
-    # Combine all sections
-    full_report = header + "".join(sections)
+    row_count = self.row_count if self.df is None else len(self.df)
+    header += f"**Dataset Summary:** {row_count} transactions analyzed\n\n"
+
+    # Run each analysis; they are independent, so they may run in any order
+    if executor is None:
+        for method_name in analysis_methods:
+            sections[method_name] = _render_section(self, method_name)
+    elif executor == 'thread':
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for method_name, section in zip(analysis_methods,
+                                            pool.map(lambda name: _render_section(self, name), analysis_methods)):
+                sections[method_name] = section
+    else:
+        # Build shared partial aggregates once here rather than once in every worker
+        if self.df is not None:
+            for name in getattr(self, '_PARTIALS', {}):
+                partial_aggregate(self, name)
+
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self,)) as pool:
+            for method_name, section in zip(analysis_methods, pool.map(_render_in_worker, analysis_methods)):
+                sections[method_name] = section
+
+    # Combine all sections in a deterministic order
+    full_report = header + "".join(sections[method_name] for method_name in analysis_methods)
 
     # Write to file
     with open(output_path, 'w', encoding='utf-8') as f: